@@ -1,10 +1,107 @@
 from AccessControl import ClassSecurityInfo
+from AccessControl import getSecurityManager
+from Acquisition import aq_base
 from App.class_init import InitializeClass
 from Products.CMFCore.ActionInformation import ActionInfo
 from Products.CMFCore.ActionsTool import ActionsTool as BaseTool
 from Products.CMFCore.interfaces import IActionProvider
 from Products.CMFPlone.PloneBaseTool import PloneBaseTool
 from Products.CMFCore.interfaces import IActionCategory
+from zope.annotation.interfaces import IAnnotations
+
+ACTION_INFOS_KEY = 'Products.CMFPlone.ActionsTool.action_infos'
+
+
+def _isVisible(action):
+    if isinstance(action, dict):
+        return action.get('visible', True)
+    return getattr(aq_base(action), 'visible', True)
+
+
+def _splitActionIdent(action_ident):
+    sep = action_ident.rfind('/')
+    return action_ident[:sep], action_ident[sep + 1:]
+
+
+def normalizeActionChain(action_chain):
+    if not action_chain:
+        return ()
+    if isinstance(action_chain, basestring):
+        return (action_chain, )
+    return tuple(action_chain)
+
+
+def _hashable(categories):
+    if categories is None or isinstance(categories, basestring):
+        return categories
+    return tuple(categories)
+
+
+def filterActionInfos(actions, ec, action_chain=None, check_visibility=1,
+                      check_permissions=1, check_condition=1, max=-1,
+                      ignore_categories=None):
+    """Wrap actions in ActionInfo objects and filter them.
+
+    Invisible actions are skipped before they are wrapped, and an
+    action_chain is resolved through an index on (category, id).
+    """
+    if check_visibility:
+        actions = [action for action in actions if _isVisible(action)]
+    actions = [ActionInfo(action, ec) for action in actions]
+
+    action_chain = normalizeActionChain(action_chain)
+    if action_chain:
+        index = {}
+        for ai in actions:
+            index.setdefault((ai['category'], ai['id']), []).append(ai)
+        actions = []
+        for action_ident in action_chain:
+            actions.extend(index.get(_splitActionIdent(action_ident), ()))
+
+    if ignore_categories is not None:
+        actions = [ai for ai in actions
+                   if ai['category'] not in ignore_categories]
+
+    action_infos = []
+    for ai in actions:
+        if check_visibility and not ai['visible']:
+            continue
+        if check_permissions and not ai['allowed']:
+            continue
+        if check_condition and not ai['available']:
+            continue
+        action_infos.append(ai)
+        if max + 1 and len(action_infos) >= max:
+            break
+    return action_infos
+
+
+def cachedActionInfos(provider, object, key, compute):
+    """Return compute(), memoized on the request for the provider, the
+    object, the current user and the given key.
+
+    Every call gets copies of the action infos, so callers can change them.
+    """
+    annotations = IAnnotations(getattr(provider, 'REQUEST', None), None)
+    if annotations is None:
+        return compute()
+    cache = annotations.setdefault(ACTION_INFOS_KEY, {})
+    user = getSecurityManager().getUser()
+    key = (provider.getId(), id(object), id(user)) + key
+    cached = cache.get(key)
+    # Keep the object and user, so their ids can not be reused
+    if cached is None or cached[0] is not object or cached[1] is not user:
+        cached = (object, user, compute())
+        cache[key] = cached
+    return [ai.copy() for ai in cached[2]]
+
+
+def invalidateActionInfos(request):
+    """Forget the action infos memoized on the request.
+    """
+    annotations = IAnnotations(request, None)
+    if annotations is not None:
+        annotations.pop(ACTION_INFOS_KEY, None)
 
 
 class ActionsTool(PloneBaseTool, BaseTool):
@@ -46,43 +143,35 @@ class ActionsTool(PloneBaseTool, BaseTool):
                         categories=None, ignore_categories=None):
         # List ActionInfo objects.
         # (method is without docstring to disable publishing)
+        action_chain = normalizeActionChain(action_chain)
+        categories = _hashable(categories)
+        ignore_categories = _hashable(ignore_categories)
+        key = ('listActionInfos', action_chain, check_visibility,
+               check_permissions, check_condition, max,
+               categories, ignore_categories)
+        return cachedActionInfos(
+            self, object, key,
+            lambda: self._listActionInfos(
+                action_chain, object, check_visibility, check_permissions,
+                check_condition, max, categories, ignore_categories))
+
+    def _listActionInfos(self, action_chain, object, check_visibility,
+                         check_permissions, check_condition, max,
+                         categories, ignore_categories):
+        if action_chain and categories is None:
+            # Only the categories of the chain need to be looked at
+            categories = set(_splitActionIdent(ident)[0].split('/')[0]
+                             for ident in action_chain)
         actions = self.listActions(object=object,
                                    categories=categories,
                                    ignore_categories=ignore_categories)
         if not actions:
             return []
 
-        ec = self._getExprContext(object)
-        actions = [ActionInfo(action, ec) for action in actions]
-
-        if action_chain:
-            filtered_actions = []
-            if isinstance(action_chain, basestring):
-                action_chain = (action_chain, )
-            for action_ident in action_chain:
-                sep = action_ident.rfind('/')
-                category, id = action_ident[:sep], action_ident[sep + 1:]
-                for ai in actions:
-                    if id == ai['id'] and category == ai['category']:
-                        filtered_actions.append(ai)
-            actions = filtered_actions
-
-        if ignore_categories is not None:
-            actions = [ai for ai in actions
-                          if ai['category'] not in ignore_categories]
-
-        action_infos = []
-        for ai in actions:
-            if check_visibility and not ai['visible']:
-                continue
-            if check_permissions and not ai['allowed']:
-                continue
-            if check_condition and not ai['available']:
-                continue
-            action_infos.append(ai)
-            if max + 1 and len(action_infos) >= max:
-                break
-        return action_infos
+        return filterActionInfos(
+            actions, self._getExprContext(object), action_chain,
+            check_visibility, check_permissions, check_condition, max,
+            ignore_categories)
 
     #
     #   'portal_actions' interface methods
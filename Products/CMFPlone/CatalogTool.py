@@ -1,6 +1,7 @@
 import logging
 import re
 import time
+import transaction
 import urllib
 
 from AccessControl import ClassSecurityInfo
@@ -22,16 +23,19 @@ from Products.CMFCore.permissions import AccessInactivePortalContent
 from Products.CMFCore.utils import _checkPermission
 from Products.CMFCore.utils import _getAuthenticatedUser
 from Products.CMFCore.utils import getToolByName
+from Products.CMFPlone import indexing
 from Products.CMFPlone.PloneBaseTool import PloneBaseTool
 from Products.CMFPlone.interfaces import INonStructuralFolder
 from Products.CMFPlone.interfaces import IPloneCatalogTool
 from Products.CMFPlone.utils import base_hasattr
+from Products.CMFPlone.utils import pretty_title_or_id
 from Products.CMFPlone.utils import safe_callable
 from Products.CMFPlone.utils import safe_unicode
 from Products.ZCatalog.ZCatalog import ZCatalog
 from plone.i18n.normalizer.base import mapUnicode
 from plone.indexer import indexer
 from plone.indexer.interfaces import IIndexableObject
+from zope.annotation.interfaces import IAnnotations
 from zope.component import queryMultiAdapter
 from zope.interface import Interface
 from zope.interface import implementer
@@ -42,6 +46,8 @@ logger = logging.getLogger('Plone')
 
 _marker = object()
 
+SECURITY_CACHE_KEY = 'Products.CMFPlone.CatalogTool.security_terms'
+
 MAX_SORTABLE_TITLE = 40
 BLACKLISTED_INTERFACES = frozenset((
     'AccessControl.interfaces.IOwned',
@@ -149,12 +155,33 @@ def allowedRolesAndUsers(obj):
     return list(allowed)
 
 
-@indexer(Interface)
-def object_provides(obj):
-    return tuple(
-        [i.__identifier__ for i in providedBy(obj).flattened()
+# Maps id(spec) to (spec, spec.__iro__, identifiers).  The result of
+# object_provides only depends on the interface specification of the object,
+# which zope.interface shares between all instances of a class that do not
+# directly provide extra interfaces.
+_object_provides_cache = {}
+OBJECT_PROVIDES_CACHE_SIZE = 1000
+
+
+def _provided_identifiers(spec):
+    cached = _object_provides_cache.get(id(spec))
+    # When interfaces are declared after the fact, the specification
+    # recomputes its resolution order, which invalidates the cached entry.
+    if cached is not None and cached[0] is spec and cached[1] is spec.__iro__:
+        return cached[2]
+    result = tuple(
+        [i.__identifier__ for i in spec.flattened()
          if i.__identifier__ not in BLACKLISTED_INTERFACES]
     )
+    if len(_object_provides_cache) >= OBJECT_PROVIDES_CACHE_SIZE:
+        _object_provides_cache.clear()
+    _object_provides_cache[id(spec)] = (spec, spec.__iro__, result)
+    return result
+
+
+@indexer(Interface)
+def object_provides(obj):
+    return _provided_identifiers(providedBy(obj))
 
 
 def zero_fill(matchobj):
@@ -186,6 +213,14 @@ def sortable_title(obj):
     return ''
 
 
+@indexer(Interface)
+def pretty_title(obj):
+    """ Title or id as shown in listings, empty for untitled items with an
+    autogenerated id.
+    """
+    return pretty_title_or_id(obj, obj, empty_value='')
+
+
 @indexer(Interface)
 def getObjPositionInParent(obj):
     """ Helper method for catalog based folder contents.
@@ -273,6 +308,17 @@ class CatalogTool(PloneBaseTool, BaseTool):
     security = ClassSecurityInfo()
     toolicon = 'skins/plone_images/book_icon.png'
     _counter = None
+    _rebuild_checkpoint = None
+
+    # Round the effectiveRange query to this many seconds, so repeated
+    # queries use identical terms.  0 disables rounding.
+    effective_range_granularity = 0
+    # Queue content (re|un)indexing until the end of the transaction
+    defer_indexing = False
+    _properties = BaseTool._properties + (
+        {'id': 'effective_range_granularity', 'type': 'int', 'mode': 'w'},
+        {'id': 'defer_indexing', 'type': 'boolean', 'mode': 'w'},
+    )
 
     manage_catalogAdvanced = DTMLFile('www/catalogAdvanced', globals())
 
@@ -315,6 +361,41 @@ class CatalogTool(PloneBaseTool, BaseTool):
         result.append('Anonymous')
         return result
 
+    def _getRequestCache(self):
+        """Dictionary on the current request to keep security query terms.
+        """
+        request = getattr(self, 'REQUEST', None)
+        annotations = IAnnotations(request, None)
+        if annotations is None:
+            return {}
+        return annotations.setdefault(SECURITY_CACHE_KEY, {})
+
+    def _cachedAllowedRolesAndUsers(self, user):
+        """Like _listAllowedRolesAndUsers but computed once per request
+        and user.
+        """
+        cache = self._getRequestCache()
+        # Keep the user object in the cache, so its id can not be reused
+        cached = cache.get(id(user))
+        if cached is None or cached[0] is not user:
+            cached = (user, self._listAllowedRolesAndUsers(user))
+            cache[id(user)] = cached
+        return list(cached[1])
+
+    def _getEffectiveRangeDate(self):
+        """The date used to filter on effectiveRange.
+        """
+        granularity = self.effective_range_granularity
+        if not granularity:
+            return DateTime()
+        now = int(time.time())
+        now = now - now % granularity
+        cache = self._getRequestCache()
+        cached = cache.get('effectiveRange')
+        if cached is None or cached.timeTime() != now:
+            cached = cache['effectiveRange'] = DateTime(now)
+        return cached
+
     @security.private
     def indexObject(self, object, idxs=None):
         """Add object to catalog.
@@ -326,6 +407,65 @@ class CatalogTool(PloneBaseTool, BaseTool):
             idxs = []
         self.reindexObject(object, idxs)
 
+    @security.private
+    def reindexObject(self, object, idxs=[], update_metadata=1, uid=None):
+        """Update catalog after object data has changed.
+
+        With defer_indexing set or in an indexing.deferred() block, this is
+        queued until the end of the transaction.  Specific indexes of an
+        object that is already cataloged are updated by reindexIndexes.
+        """
+        if uid is None:
+            uid = self._url(object)
+        if not (self.defer_indexing or indexing.isDeferred()):
+            return self._reindexObjectNow(object, idxs, update_metadata, uid)
+        indexing.getQueue().catalog(self, object, uid, idxs, update_metadata)
+
+    @security.private
+    def unindexObject(self, object):
+        """Remove object from catalog.
+
+        With defer_indexing set or in an indexing.deferred() block, this is
+        queued until the end of the transaction.
+        """
+        if not (self.defer_indexing or indexing.isDeferred()):
+            return BaseTool.unindexObject(self, object)
+        indexing.getQueue().uncatalog(self, self._url(object))
+
+    def _url(self, object):
+        return '/'.join(object.getPhysicalPath())
+
+    def _reindexObjectNow(self, object, idxs, update_metadata, uid):
+        if idxs:
+            indexes = self._catalog.indexes
+            valid = [name for name in idxs if name in indexes]
+            if valid and self._catalog.uids.get(uid) is not None:
+                self._reindexIndexesNow(object, valid, update_metadata, uid)
+                return
+        BaseTool.reindexObject(self, object, idxs, update_metadata, uid)
+
+    def _unindexObjectNow(self, uid):
+        if self._catalog.uids.get(uid) is not None:
+            self.uncatalog_object(uid)
+
+    @security.private
+    def processQueue(self):
+        """Apply the queued indexing operations of the current transaction.
+        """
+        indexing.processQueue()
+
+    def _wrapObject(self, object):
+        """Return the IIndexableObject the indexes are computed from.
+        """
+        if IIndexableObject.providedBy(object):
+            return object
+        # This is the CMF 2.2 compatible approach, which should be used
+        # going forward
+        wrapper = queryMultiAdapter((object, self), IIndexableObject)
+        if wrapper is not None:
+            return wrapper
+        return object
+
     @security.protected(ManageZCatalogEntries)
     def catalog_object(self, object, uid=None, idxs=None,
                        update_metadata=1, pghandler=None):
@@ -333,17 +473,56 @@ class CatalogTool(PloneBaseTool, BaseTool):
             idxs = []
         self._increment_counter()
 
-        w = object
-        if not IIndexableObject.providedBy(object):
-            # This is the CMF 2.2 compatible approach, which should be used
-            # going forward
-            wrapper = queryMultiAdapter((object, self), IIndexableObject)
-            if wrapper is not None:
-                w = wrapper
+        w = self._wrapObject(object)
 
         ZCatalog.catalog_object(self, w, uid, idxs,
                                 update_metadata, pghandler=pghandler)
 
+    @security.protected(ManageZCatalogEntries)
+    def reindexIndexes(self, object, idxs, update_metadata=1, uid=None):
+        """Update only the given indexes of an already cataloged object.
+
+        Contrary to catalog_object, only the requested indexers are
+        computed.  Nothing is written when the values did not change.
+        Objects that are not cataloged yet are fully indexed.
+
+        Returns True if the catalog was modified.  With defer_indexing set
+        or in an indexing.deferred() block, the update is queued and None
+        is returned.
+        """
+        if uid is None:
+            uid = self._url(object)
+        if self.defer_indexing or indexing.isDeferred():
+            indexing.getQueue().catalog(
+                self, object, uid, idxs, update_metadata)
+            return
+        if self._catalog.uids.get(uid) is None:
+            self.catalog_object(object, uid)
+            return True
+        return self._reindexIndexesNow(object, idxs, update_metadata, uid)
+
+    def _reindexIndexesNow(self, object, idxs, update_metadata, uid):
+        catalog = self._catalog
+        rid = catalog.uids[uid]
+        w = self._wrapObject(object)
+        changed = False
+        for name in idxs:
+            if name not in catalog.indexes:
+                continue
+            index = catalog.getIndex(name)
+            if index.index_object(rid, w):
+                changed = True
+
+        if update_metadata:
+            record = catalog.recordify(w)
+            if catalog.data[rid] != record:
+                catalog.data[rid] = record
+                changed = True
+
+        if changed:
+            self._increment_counter()
+        return changed
+
     @security.protected(ManageZCatalogEntries)
     def uncatalog_object(self, *args, **kwargs):
         self._increment_counter()
@@ -358,6 +537,21 @@ class CatalogTool(PloneBaseTool, BaseTool):
     def getCounter(self):
         return self._counter is not None and self._counter() or 0
 
+    @security.private
+    def getCommittedCounter(self):
+        """Return a key identifying the committed state of the catalog,
+        usable in caches shared between threads.
+
+        Returns None when the catalog was changed in the current transaction,
+        as results then depend on uncommitted data.
+        """
+        counter = self._counter
+        if counter is None:
+            return 0
+        if counter._p_jar is None or counter._p_changed:
+            return None
+        return (counter(), counter._p_serial)
+
     @security.protected(SearchZCatalog)
     def searchResults(self, REQUEST=None, **kw):
         """Calls ZCatalog.searchResults with extra arguments that
@@ -369,24 +563,31 @@ class CatalogTool(PloneBaseTool, BaseTool):
         effectiveRange checking entirely even for those without portal
         wide AccessInactivePortalContent permission.
         """
+        indexing.processQueue()
         kw = kw.copy()
         show_inactive = kw.get('show_inactive', False)
         if isinstance(REQUEST, dict) and not show_inactive:
             show_inactive = 'show_inactive' in REQUEST
 
         user = _getAuthenticatedUser(self)
-        kw['allowedRolesAndUsers'] = self._listAllowedRolesAndUsers(user)
+        kw['allowedRolesAndUsers'] = self._cachedAllowedRolesAndUsers(user)
 
         if not show_inactive \
            and not _checkPermission(AccessInactivePortalContent, self):
-            kw['effectiveRange'] = DateTime()
+            kw['effectiveRange'] = self._getEffectiveRangeDate()
 
         return ZCatalog.searchResults(self, REQUEST, **kw)
 
     __call__ = searchResults
 
+    @security.protected(ManageZCatalogEntries)
+    def unrestrictedSearchResults(self, REQUEST=None, **kw):
+        indexing.processQueue()
+        return BaseTool.unrestrictedSearchResults(self, REQUEST, **kw)
+
     def search(self, *args, **kw):
         # Wrap search() the same way that searchResults() is
+        indexing.processQueue()
         query = {}
 
         if args:
@@ -397,54 +598,101 @@ class CatalogTool(PloneBaseTool, BaseTool):
         kw['query_request'] = query.copy()
 
         user = _getAuthenticatedUser(self)
-        query['allowedRolesAndUsers'] = self._listAllowedRolesAndUsers(user)
+        query['allowedRolesAndUsers'] = self._cachedAllowedRolesAndUsers(user)
 
         if not _checkPermission(AccessInactivePortalContent, self):
-            query['effectiveRange'] = DateTime()
+            query['effectiveRange'] = self._getEffectiveRangeDate()
 
         kw['query_request'] = query
 
         return super(CatalogTool, self).search(**kw)
 
     @security.protected(ManageZCatalogEntries)
-    def clearFindAndRebuild(self):
+    def clearFindAndRebuild(self, batch_size=0, resume=False):
         """Empties catalog, then finds all contentish objects (i.e. objects
            with an indexObject method), and reindexes them.
            This may take a long time.
+
+           If batch_size is given, the transaction is committed every
+           batch_size objects and a checkpoint is stored on the catalog.
+           Calling again with resume=True continues an interrupted rebuild
+           after the last checkpoint instead of clearing the catalog.
+
+           Returns the number of objects that were indexed.
         """
-        def indexObject(obj, path):
-            if (base_hasattr(obj, 'indexObject') and
-                    safe_callable(obj.indexObject)):
-                try:
-                    obj.indexObject()
-                except TypeError:
-                    # Catalogs have 'indexObject' as well, but they
-                    # take different args, and will fail
-                    pass
-        self.manage_catalogClear()
+        checkpoint = resume and self._rebuild_checkpoint or None
+        if checkpoint is None:
+            self.manage_catalogClear()
         portal = aq_parent(aq_inner(self))
-        portal.ZopeFindAndApply(
-            portal,
-            search_sub=True,
-            apply_func=indexObject
-        )
+        counter = [0]
+
+        def indexTree(parent, path):
+            # Children are walked in id order, so physical paths are
+            # visited in lexicographical order and the checkpoint is a
+            # simple bound.
+            for id, obj in sorted(parent.objectItems()):
+                obj_path = path + (id, )
+                folderish = base_hasattr(obj, 'objectItems')
+                if checkpoint is not None and obj_path <= checkpoint:
+                    # Indexed before the checkpoint, only descend when the
+                    # checkpoint lies inside this object.
+                    if folderish and checkpoint[:len(obj_path)] == obj_path:
+                        indexTree(obj, obj_path)
+                    continue
+                if (base_hasattr(obj, 'indexObject') and
+                        safe_callable(obj.indexObject)):
+                    try:
+                        obj.indexObject()
+                    except TypeError:
+                        # Catalogs have 'indexObject' as well, but they
+                        # take different args, and will fail
+                        pass
+                    else:
+                        counter[0] += 1
+                        if batch_size and not counter[0] % batch_size:
+                            self._rebuild_checkpoint = obj_path
+                            transaction.commit()
+                            logger.info(
+                                'Catalog rebuild: %d objects indexed, '
+                                'checkpoint at %s',
+                                counter[0], '/'.join(obj_path))
+                if folderish:
+                    indexTree(obj, obj_path)
+
+        indexTree(portal, portal.getPhysicalPath())
+        self._rebuild_checkpoint = None
+        return counter[0]
+
+    @security.protected(ManageZCatalogEntries)
+    def getRebuildCheckpoint(self):
+        """Path of the last object committed by an unfinished rebuild.
+        """
+        if self._rebuild_checkpoint is None:
+            return None
+        return '/'.join(self._rebuild_checkpoint)
 
     @security.protected(ManageZCatalogEntries)
-    def manage_catalogRebuild(self, RESPONSE=None, URL1=None):
+    def manage_catalogRebuild(self, RESPONSE=None, URL1=None,
+                              batch_size=0, resume=False):
         """Clears the catalog and indexes all objects with an 'indexObject'
         method. This may take a long time.
         """
         elapse = time.time()
         c_elapse = time.clock()
 
-        self.clearFindAndRebuild()
+        count = self.clearFindAndRebuild(batch_size=batch_size,
+                                         resume=resume)
 
         elapse = time.time() - elapse
         c_elapse = time.clock() - c_elapse
 
         msg = ('Catalog Rebuilt\n'
+               'Objects indexed: %d\n'
+               'Objects per second: %.1f\n'
                'Total time: %s\n'
-               'Total CPU time: %s' % (repr(elapse), repr(c_elapse)))
+               'Total CPU time: %s' % (
+                   count, elapse and count / elapse or 0.0,
+                   repr(elapse), repr(c_elapse)))
         logger.info(msg)
 
         if RESPONSE is not None:
@@ -3,6 +3,7 @@ from AccessControl import ClassSecurityInfo
 from AccessControl import getSecurityManager
 from AccessControl import Unauthorized
 from AccessControl.requestmethod import postonly
+from collections import OrderedDict
 from Acquisition import aq_base
 from Acquisition import aq_inner
 from Acquisition import aq_parent
@@ -24,7 +25,9 @@ from Products.CMFCore.utils import getToolByName
 from Products.CMFCore.utils import UniqueObject
 from Products.CMFCore.WorkflowCore import WorkflowException
 from Products.CMFDynamicViewFTI.interfaces import IBrowserDefault
+from Products.CMFPlone import indexing
 from Products.CMFPlone import utils
+from Products.CMFPlone.checkid import check_ids
 from Products.CMFPlone.defaultpage import check_default_page_via_view
 from Products.CMFPlone.defaultpage import get_default_page_via_view
 from Products.CMFPlone.events import ReorderedEvent
@@ -44,6 +47,7 @@ from Products.CMFPlone.utils import transaction_note
 from Products.statusmessages.interfaces import IStatusMessage
 from types import UnicodeType
 from ZODB.POSException import ConflictError
+from zExceptions import BadRequest
 from zope.component import getUtility
 from zope.component import queryAdapter
 from zope.deprecation import deprecate
@@ -1135,6 +1139,32 @@ class PloneTool(PloneBaseTool, UniqueObject, SimpleItem):
         else:
             return None
 
+    def _groupByParent(self, paths, failure, handle_errors, traverse):
+        """Traverse to the paths and group the objects by container.
+
+        Returns a list of (container, [(path, obj), ...]) in the order the
+        containers were first seen.  Paths that can not be traversed are
+        noted in failure.
+        """
+        groups = OrderedDict()
+        for path in paths:
+            try:
+                obj = traverse(path)
+                parent = aq_parent(aq_inner(obj))
+                key = parent.getPhysicalPath()
+            except ConflictError:
+                raise
+            except Exception, e:
+                if handle_errors:
+                    failure[path] = e
+                    log_exc()
+                    continue
+                raise
+            if key not in groups:
+                groups[key] = (parent, [])
+            groups[key][1].append((path, obj))
+        return groups.values()
+
     # This is public because we don't know what permissions the user
     # has on the objects to be deleted.  The restrictedTraverse and
     # manage_delObjects calls should handle permission checks for us.
@@ -1147,28 +1177,74 @@ class PloneTool(PloneBaseTool, UniqueObject, SimpleItem):
         # use the portal for traversal in case we have relative paths
         portal = getToolByName(self, 'portal_url').getPortalObject()
         traverse = portal.restrictedTraverse
-        for path in paths:
-            # Skip and note any errors
-            if handle_errors:
-                sp = transaction.savepoint(optimistic=True)
-            try:
-                obj = traverse(path)
-                obj_parent = aq_parent(aq_inner(obj))
-                obj_parent.manage_delObjects([obj.getId()])
-                success.append('%s (%s)' % (obj.getId(), path))
-            except ConflictError:
-                raise
-            except Exception, e:
+        deleted = []
+        with indexing.deferred():
+            groups = self._groupByParent(paths, failure, handle_errors,
+                                         traverse)
+            for parent, items in groups:
+                parent_path = parent.getPhysicalPath()
+                if [p for p in deleted if parent_path[:len(p)] == p]:
+                    # The container was deleted with an item of an earlier
+                    # container, look the items up again one by one.
+                    for path, obj in items:
+                        self._deleteObjectByPath(traverse, path, success,
+                                                 failure, handle_errors)
+                    continue
+                # Delete all items of a container at once, only when that
+                # fails, find out item by item what can be deleted.
                 if handle_errors:
-                    sp.rollback()
-                    failure[path] = e
-                    log_exc()
-                else:
+                    sp = transaction.savepoint(optimistic=True)
+                try:
+                    parent.manage_delObjects(
+                        [obj.getId() for path, obj in items])
+                    success.extend(['%s (%s)' % (obj.getId(), path)
+                                    for path, obj in items])
+                    deleted.extend([parent_path + (obj.getId(), )
+                                    for path, obj in items])
+                    continue
+                except ConflictError:
                     raise
+                except Exception:
+                    if not handle_errors:
+                        raise
+                    sp.rollback()
+                for path, obj in items:
+                    sp = transaction.savepoint(optimistic=True)
+                    try:
+                        parent.manage_delObjects([obj.getId()])
+                        success.append('%s (%s)' % (obj.getId(), path))
+                        deleted.append(parent_path + (obj.getId(), ))
+                    except ConflictError:
+                        raise
+                    except Exception, e:
+                        sp.rollback()
+                        failure[path] = e
+                        log_exc()
         transaction_note('Deleted %s' % (', '.join(success)))
         return success, failure
+
     deleteObjectsByPaths = postonly(deleteObjectsByPaths)
 
+    def _deleteObjectByPath(self, traverse, path, success, failure,
+                            handle_errors):
+        # Skip and note any errors
+        if handle_errors:
+            sp = transaction.savepoint(optimistic=True)
+        try:
+            obj = traverse(path)
+            obj_parent = aq_parent(aq_inner(obj))
+            obj_parent.manage_delObjects([obj.getId()])
+            success.append('%s (%s)' % (obj.getId(), path))
+        except ConflictError:
+            raise
+        except Exception, e:
+            if handle_errors:
+                sp.rollback()
+                failure[path] = e
+                log_exc()
+            else:
+                raise
+
     @security.public
     def transitionObjectsByPaths(self, workflow_action, paths, comment='',
                                  expiration_date=None, effective_date=None,
@@ -1178,12 +1254,24 @@ class PloneTool(PloneBaseTool, UniqueObject, SimpleItem):
         failure = {}
         # use the portal for traversal in case we have relative paths
         portal = getToolByName(self, 'portal_url').getPortalObject()
-        traverse = portal.restrictedTraverse
-        for path in paths:
+        items = [(path, portal.restrictedTraverse(path, None))
+                 for path in paths]
+        with indexing.deferred():
+            self._transitionObjects(workflow_action, items, comment,
+                                    expiration_date, effective_date,
+                                    include_children, handle_errors, failure)
+        return failure
+    transitionObjectsByPaths = postonly(transitionObjectsByPaths)
+
+    def _transitionObjects(self, workflow_action, items, comment,
+                           expiration_date, effective_date, include_children,
+                           handle_errors, failure):
+        # Sub-objects are traversed from their parent instead of from the
+        # portal.
+        for path, o in items:
             if handle_errors:
                 sp = transaction.savepoint(optimistic=True)
             try:
-                o = traverse(path, None)
                 if o is not None:
                     o.content_status_modify(workflow_action,
                                             comment,
@@ -1199,13 +1287,24 @@ class PloneTool(PloneBaseTool, UniqueObject, SimpleItem):
                 else:
                     raise
             if getattr(o, 'isPrincipiaFolderish', None) and include_children:
-                subobject_paths = ["%s/%s" % (path, id) for id in o]
-                self.transitionObjectsByPaths(workflow_action, subobject_paths,
-                                              comment, expiration_date,
-                                              effective_date, include_children,
-                                              handle_errors)
-        return failure
-    transitionObjectsByPaths = postonly(transitionObjectsByPaths)
+                subitems = [("%s/%s" % (path, id),
+                             o.restrictedTraverse(id, None)) for id in o]
+                self._transitionObjects(workflow_action, subitems, comment,
+                                        expiration_date, effective_date,
+                                        include_children, handle_errors,
+                                        failure)
+
+    def _retitleObject(self, obj, new_title):
+        """Set a new title, returns True if it changed.
+        """
+        if not new_title or obj.Title() == new_title:
+            return False
+        getSecurityManager().validate(
+            obj, obj, 'setTitle', obj.setTitle
+        )
+        obj.setTitle(new_title)
+        notify(ObjectModifiedEvent(obj))
+        return True
 
     @security.public
     def renameObjectsByPaths(self, paths, new_ids, new_titles,
@@ -1215,44 +1314,109 @@ class PloneTool(PloneBaseTool, UniqueObject, SimpleItem):
         # use the portal for traversal in case we have relative paths
         portal = getToolByName(self, 'portal_url').getPortalObject()
         traverse = portal.restrictedTraverse
+        # A path given more than once is looked up again after the earlier
+        # renames, so the paths are handled in runs without repeats.
+        runs = [[]]
+        seen = set()
         for i, path in enumerate(paths):
-            new_id = new_ids[i]
-            new_title = new_titles[i]
+            if path in seen:
+                runs.append([])
+                seen = set()
+            seen.add(path)
+            runs[-1].append(i)
+        with indexing.deferred():
+            for run in runs:
+                new_values = dict((paths[i], (new_ids[i], new_titles[i]))
+                                  for i in run)
+                self._renameRun([paths[i] for i in run], new_values,
+                                traverse, success, failure, handle_errors)
+        transaction_note('Renamed %s' % str(success.keys()))
+        return success, failure
+    renameObjectsByPaths = postonly(renameObjectsByPaths)
+
+    def _renameRun(self, paths, new_values, traverse, success, failure,
+                   handle_errors):
+        """Rename the objects at paths, which are all different.
+        """
+        groups = self._groupByParent(
+            paths, failure, handle_errors,
+            lambda path: traverse(path, None))
+        for parent, items in groups:
+            items = self._checkNewIds(parent, items, new_values, failure,
+                                      handle_errors)
+            if not items:
+                continue
+            # Rename all items of a container at once, only when that
+            # fails, fall back to renaming item by item.
             if handle_errors:
                 sp = transaction.savepoint(optimistic=True)
             try:
-                obj = traverse(path, None)
-                obid = obj.getId()
-                title = obj.Title()
-                change_title = new_title and title != new_title
-                changed = False
-                if change_title:
-                    getSecurityManager().validate(
-                        obj, obj, 'setTitle', obj.setTitle
-                    )
-                    obj.setTitle(new_title)
-                    notify(ObjectModifiedEvent(obj))
-                    changed = True
-                if new_id and obid != new_id:
-                    parent = aq_parent(aq_inner(obj))
-                    parent.manage_renameObjects((obid,), (new_id,))
-                    changed = True
-                elif change_title:
-                    # the rename will have already triggered a reindex
-                    obj.reindexObject()
-                if changed:
-                    success[path] = (new_id, new_title)
+                self._renameObjects(parent, items, new_values, success)
+                continue
             except ConflictError:
                 raise
-            except Exception, e:
-                if handle_errors:
-                    # skip this object but continue with sub-objects.
-                    sp.rollback()
-                    failure[path] = e
-                else:
+            except Exception:
+                if not handle_errors:
                     raise
-        transaction_note('Renamed %s' % str(success.keys()))
-        return success, failure
-    renameObjectsByPaths = postonly(renameObjectsByPaths)
+                sp.rollback()
+            for item in items:
+                sp = transaction.savepoint(optimistic=True)
+                try:
+                    self._renameObjects(parent, [item], new_values,
+                                        success)
+                except ConflictError:
+                    raise
+                except Exception, e:
+                    # skip this object but continue with the others.
+                    sp.rollback()
+                    success.pop(item[0], None)
+                    failure[item[0]] = e
+
+    def _checkNewIds(self, parent, items, new_values, failure,
+                     handle_errors):
+        """Validate the new ids of the items of parent at once.
+
+        Returns the items that can be renamed, the others are noted in
+        failure.
+        """
+        new_ids = {}
+        for path, obj in items:
+            new_id = new_values[path][0]
+            if new_id and obj.getId() != new_id:
+                new_ids[path] = new_id
+        errors = new_ids and check_ids(parent, new_ids.values())
+        if not errors:
+            return items
+        valid = []
+        for path, obj in items:
+            error = errors.get(new_ids.get(path))
+            if error is None:
+                valid.append((path, obj))
+            elif handle_errors:
+                failure[path] = BadRequest(error)
+            else:
+                raise BadRequest(error)
+        return valid
+
+    def _renameObjects(self, parent, items, new_values, success):
+        old_ids = []
+        ids = []
+        changed = []
+        for path, obj in items:
+            new_id, new_title = new_values[path]
+            obid = obj.getId()
+            change_title = self._retitleObject(obj, new_title)
+            if new_id and obid != new_id:
+                old_ids.append(obid)
+                ids.append(new_id)
+                changed.append(path)
+            elif change_title:
+                # the rename will trigger a reindex
+                obj.reindexObject()
+                changed.append(path)
+        if old_ids:
+            parent.manage_renameObjects(old_ids, ids)
+        for path in changed:
+            success[path] = new_values[path]
 
 InitializeClass(PloneTool)
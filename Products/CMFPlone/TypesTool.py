@@ -1,10 +1,12 @@
 from AccessControl import ClassSecurityInfo
 from App.class_init import InitializeClass
 
-from Products.CMFCore.ActionInformation import ActionInfo
 from Products.CMFCore.interfaces import IAction
 from Products.CMFCore.TypesTool import TypesTool as BaseTool
 
+from Products.CMFPlone.ActionsTool import cachedActionInfos
+from Products.CMFPlone.ActionsTool import filterActionInfos
+from Products.CMFPlone.ActionsTool import normalizeActionChain
 from Products.CMFPlone.PloneBaseTool import PloneBaseTool
 
 
@@ -55,37 +57,24 @@ class TypesTool(PloneBaseTool, BaseTool):
         # List ActionInfo objects.
         # (method is without docstring to disable publishing)
         #
+        action_chain = normalizeActionChain(action_chain)
+        key = ('listActionInfos', action_chain, check_visibility,
+               check_permissions, check_condition, max, category)
+        return cachedActionInfos(
+            self, object, key,
+            lambda: self._listActionInfos(
+                action_chain, object, check_visibility, check_permissions,
+                check_condition, max, category))
+
+    def _listActionInfos(self, action_chain, object, check_visibility,
+                         check_permissions, check_condition, max, category):
         actions = self.listActions(object=object, category=category)
         if len(actions) == 0:
             return []
 
-        ec = self._getExprContext(object)
-        actions = [ActionInfo(action, ec) for action in actions]
-
-        if action_chain:
-            filtered_actions = []
-            if isinstance(action_chain, basestring):
-                action_chain = (action_chain, )
-            for action_ident in action_chain:
-                sep = action_ident.rfind('/')
-                category, id = action_ident[:sep], action_ident[sep + 1:]
-                for ai in actions:
-                    if id == ai['id'] and category == ai['category']:
-                        filtered_actions.append(ai)
-            actions = filtered_actions
-
-        action_infos = []
-        for ai in actions:
-            if check_visibility and not ai['visible']:
-                continue
-            if check_permissions and not ai['allowed']:
-                continue
-            if check_condition and not ai['available']:
-                continue
-            action_infos.append(ai)
-            if max + 1 and len(action_infos) >= max:
-                break
-        return action_infos
+        return filterActionInfos(
+            actions, self._getExprContext(object), action_chain,
+            check_visibility, check_permissions, check_condition, max)
 
 TypesTool.__doc__ = BaseTool.__doc__
 
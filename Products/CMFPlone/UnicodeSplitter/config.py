@@ -53,3 +53,33 @@ rxGlob_L = re.compile(r"\w+[\w*?]*", re.LOCALE)
 
 pattern = re.compile(glob_false, re.UNICODE)
 pattern_g = re.compile(glob_true, re.UNICODE)
+
+
+## Single pass splitting, used when indexing.
+def _word_char_class(ranges):
+    """Return a regex character class body with the word characters (\w)
+    of the given "a-b" code point ranges.  The table is computed once,
+    so the splitting regex does not need a \w lookahead per character.
+    """
+    chars = []
+    for i in range(0, len(ranges), 3):
+        start, end = ord(ranges[i]), ord(ranges[i + 2])
+        chars.extend(c for c in range(start, end + 1)
+                     if rx_U.match(unichr(c)))
+    parts = []
+    first = last = None
+    for c in chars + [None]:
+        if last is not None and c == last + 1:
+            last = c
+            continue
+        if first is not None:
+            parts.append(u"%s-%s" % (unichr(first), unichr(last)))
+        first = last = c
+    return u"".join(parts)
+
+# Group 1 matches words without bigram characters, the other groups runs
+# of characters of one of the bigram ranges.
+rx_split = re.compile(
+    u"([^\W%s]+)|" % allp +
+    u"|".join(u"([%s]+)" % _word_char_class(x) for x in ps),
+    re.UNICODE)
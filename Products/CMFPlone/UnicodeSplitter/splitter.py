@@ -12,8 +12,8 @@ from zope.interface import implements
 from Products.ZCTextIndex.ISplitter import ISplitter
 from Products.ZCTextIndex.PipelineFactory import element_factory
 
-from Products.CMFPlone.UnicodeSplitter.config import rx_U, rxGlob_U, \
-            rx_L, rxGlob_L, rx_all, pattern, pattern_g
+from Products.CMFPlone.UnicodeSplitter.config import rxGlob_U, \
+            rx_L, rxGlob_L, rx_all, pattern_g, rx_split
 from plone.i18n.normalizer.base import baseNormalize
 
 
@@ -30,6 +30,13 @@ def bigram(u, limit=1):
     return [u[i:i + 2] for i in xrange(len(u) - limit)]
 
 
+# Results of process_str for short strings like titles and subjects,
+# which are indexed over and over.
+CACHE_MAX_LENGTH = 100
+CACHE_SIZE = 10000
+_cache = {}
+
+
 def process_str_post(s, enc='utf-8'):
     """Receive str, remove ? and *, then return str.
     If decode gets successful, process str as unicode.
@@ -55,6 +62,10 @@ def process_str(s, enc='utf-8'):
     When decode failed, return the result splitted per word.
     Splitting depends on locale specified by rx_L.
     """
+    key = (s.__class__, s, enc)
+    cached = _cache.get(key)
+    if cached is not None:
+        return list(cached)
     try:
         if not isinstance(s, unicode):
             uni = s.decode(enc, "strict")
@@ -62,8 +73,12 @@ def process_str(s, enc='utf-8'):
             uni = s
     except UnicodeDecodeError:
         return rx_L.findall(s)
-    bigrams = process_unicode(uni)
-    return [x.encode(enc, "strict") for x in bigrams]
+    result = [x.encode(enc, "strict") for x in process_unicode(uni)]
+    if len(s) <= CACHE_MAX_LENGTH:
+        if len(_cache) >= CACHE_SIZE:
+            _cache.clear()
+        _cache[key] = tuple(result)
+    return result
 
 
 def process_str_glob(s, enc='utf-8'):
@@ -88,15 +103,22 @@ def process_unicode(uni):
     """Receive unicode string, then return a list of unicode
     as bi-grammed result.
     """
-    normalized = unicodedata.normalize('NFKC', uni)
-    for word in rx_U.findall(normalized):
-        swords = [g.group() for g in pattern.finditer(word)]
-        for sword in swords:
-            if not rx_all.match(sword[0]):
-                yield sword
-            else:
-                for x in bigram(sword, 0):
-                    yield x
+    try:
+        uni.encode('ascii')
+    except UnicodeEncodeError:
+        normalized = unicodedata.normalize('NFKC', uni)
+    else:
+        # NFKC does not change ASCII and there are no bigram characters
+        for word in rx_split.finditer(uni):
+            yield word.group()
+        return
+    for match in rx_split.finditer(normalized):
+        word = match.group()
+        if match.lastindex == 1:
+            yield word
+        else:
+            for i in xrange(len(word)):
+                yield word[i:i + 2]
 
 
 def process_unicode_glob(uni):
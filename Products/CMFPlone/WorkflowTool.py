@@ -13,6 +13,34 @@ from Products.DCWorkflow.Transitions import TRIGGER_USER_ACTION
 from Products.CMFPlone.PloneBaseTool import PloneBaseTool
 
 
+def _isMergeable(catalog_vars, metadata):
+    """Tell if the results of a worklist query can be matched on catalog
+    metadata.
+    """
+    if not catalog_vars['portal_type']:
+        return False
+    for key, values in catalog_vars.items():
+        if key == 'Language':
+            if values != 'all':
+                return False
+        elif key not in metadata or not isinstance(values, (tuple, list)):
+            return False
+    return True
+
+
+def _matchesWorklist(brain, catalog_vars):
+    for key, values in catalog_vars.items():
+        if key == 'Language':
+            continue
+        value = getattr(brain, key, None)
+        if isinstance(value, (tuple, list)):
+            if not [v for v in value if v in values]:
+                return False
+        elif value not in values:
+            return False
+    return True
+
+
 class WorkflowTool(PloneBaseTool, BaseTool):
 
     meta_type = 'Plone Workflow Tool'
@@ -136,21 +164,7 @@ class WorkflowTool(PloneBaseTool, BaseTool):
         # We want to know which types use the workflows with worklists
         # This for example avoids displaying 'pending' of multiple workflows in
         # the same worklist
-        types_tool = getToolByName(self, 'portal_types')
-        list_ptypes = types_tool.listContentTypes()
-        types_by_wf = {}  # wf:[list,of,types]
-        for t in list_ptypes:
-            for wf in self.getChainFor(t):
-                types_by_wf[wf] = types_by_wf.get(wf, []) + [t]
-
-        # Placeful stuff
-        placeful_tool = getToolByName(self, 'portal_placeful_workflow', None)
-        if placeful_tool is not None:
-            for policy in placeful_tool.getWorkflowPolicies():
-                for t in list_ptypes:
-                    chain = policy.getChainFor(t) or ()
-                    for wf in chain:
-                        types_by_wf[wf] = types_by_wf.get(wf, []) + [t]
+        types_by_wf = self._getTypesByWorkflow()
 
         wf_with_wlists = {}
         for id in self.getWorkflowIds():
@@ -184,22 +198,11 @@ class WorkflowTool(PloneBaseTool, BaseTool):
 
         return wf_with_wlists
 
-    security.declarePublic('getWorklistsResults')
-    def getWorklistsResults(self):
-        """Return all the objects concerned by one or more worklists
-
-        This method replace 'getWorklists' by implementing the whole worklists
-        work for the script.
-        An object is returned only once, even if is return by several
-        worklists. Make the whole work as expensive it is.
+    def _getTypesByWorkflow(self):
+        """Return a mapping of workflow ids to the types using them, in the
+        global or in a placeful chain.
         """
-        sm = getSecurityManager()
-        # We want to know which types use the workflows with worklists
-        # This for example avoids displaying 'pending' of multiple workflows in
-        # the same worklist
         types_tool = getToolByName(self, 'portal_types')
-        catalog = getToolByName(self, 'portal_catalog')
-
         list_ptypes = types_tool.listContentTypes()
         types_by_wf = {}  # wf:[list,of,types]
         for t in list_ptypes:
@@ -214,34 +217,97 @@ class WorkflowTool(PloneBaseTool, BaseTool):
                     chain = policy.getChainFor(t) or ()
                     for wf in chain:
                         types_by_wf[wf] = types_by_wf.get(wf, []) + [t]
+        return types_by_wf
+
+    def _getWorklistQueries(self, metadata):
+        """Return (query, worklists) pairs covering all worklists.
 
-        objects_by_path = {}
+        Worklists filtering on the same metadata columns share a query on
+        the union of their values, the results are matched against each of
+        them by _matchesWorklist.  Other worklists get their own query.
+        """
+        types_by_wf = self._getTypesByWorkflow()
+        merged = {}
+        queries = []
         for id in self.getWorkflowIds():
             wf = self.getWorkflowById(id)
-            if hasattr(wf, 'worklists'):
-                for worklist in wf.worklists:
-                    wlist_def = wf.worklists[worklist]
-                    # Make the var_matches a dict instead of PersistentMapping
-                    # to enable access from scripts
-                    catalog_vars = dict(portal_type=types_by_wf.get(id, []))
-                    for key in wlist_def.var_matches:
-                        catalog_vars[key] = wlist_def.var_matches[key]
-                    # Support LinguaPlone review situations, you want to see
-                    # content in *all* languages
-                    if 'Language' not in catalog_vars:
-                        catalog_vars['Language'] = 'all'
-                    for result in catalog.searchResults(catalog_vars):
-                        o = result.getObject()
-                        if o \
-                           and id in self.getChainFor(o) \
-                           and wlist_def.getGuard().check(sm, wf, o):
-                            absurl = o.absolute_url()
-                            if absurl:
-                                objects_by_path[absurl] = (o.modified(), o)
-
-        results = objects_by_path.values()
-        results.sort()
-        return tuple([obj[1] for obj in results])
+            if not hasattr(wf, 'worklists'):
+                continue
+            for worklist in wf.worklists:
+                wlist_def = wf.worklists[worklist]
+                # Make the var_matches a dict instead of PersistentMapping
+                # to enable access from scripts
+                catalog_vars = dict(portal_type=types_by_wf.get(id, []))
+                for key in wlist_def.var_matches or ():
+                    catalog_vars[key] = wlist_def.var_matches[key]
+                # Support LinguaPlone review situations, you want to see
+                # content in *all* languages
+                if 'Language' not in catalog_vars:
+                    catalog_vars['Language'] = 'all'
+                entry = (id, wf, wlist_def, catalog_vars)
+                if not _isMergeable(catalog_vars, metadata):
+                    queries.append((catalog_vars, [entry]))
+                    continue
+                keys = tuple(sorted(catalog_vars))
+                if keys not in merged:
+                    query = dict((key, []) for key in keys)
+                    query['Language'] = 'all'
+                    merged[keys] = (query, [])
+                    queries.append(merged[keys])
+                query, worklists = merged[keys]
+                for key in keys:
+                    if key == 'Language':
+                        continue
+                    query[key].extend([value for value in catalog_vars[key]
+                                       if value not in query[key]])
+                worklists.append(entry)
+        return queries
+
+    security.declarePublic('getWorklistsResults')
+    def getWorklistsResults(self):
+        """Return all the objects concerned by one or more worklists
+
+        This method replace 'getWorklists' by implementing the whole worklists
+        work for the script.
+        An object is returned only once, even if is return by several
+        worklists. Worklists are searched with as few catalog queries as
+        possible and objects are ordered on the modification date of the
+        catalog.
+        """
+        sm = getSecurityManager()
+        catalog = getToolByName(self, 'portal_catalog')
+        metadata = catalog.schema()
+
+        # path: (brain, worklists the brain matches)
+        candidates = {}
+        for query, worklists in self._getWorklistQueries(metadata):
+            for brain in catalog.searchResults(query):
+                if len(worklists) > 1:
+                    matching = [entry for entry in worklists
+                                if _matchesWorklist(brain, entry[3])]
+                else:
+                    matching = worklists
+                if not matching:
+                    continue
+                path = brain.getPath()
+                if path in candidates:
+                    candidates[path][1].extend(matching)
+                else:
+                    candidates[path] = (brain, list(matching))
+
+        ordered = sorted(candidates.items(),
+                         key=lambda item: (item[1][0].modified, item[0]))
+        results = []
+        for path, (brain, worklists) in ordered:
+            o = brain.getObject()
+            if not o:
+                continue
+            chain = self.getChainFor(o)
+            for id, wf, wlist_def, catalog_vars in worklists:
+                if id in chain and wlist_def.getGuard().check(sm, wf, o):
+                    results.append(o)
+                    break
+        return tuple(results)
 
     security.declareProtected(ManagePortal, 'getChainForPortalType')
     def getChainForPortalType(self, pt_name, managescreen=0):
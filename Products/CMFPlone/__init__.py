@@ -104,6 +104,10 @@ def initialize(context):
     # Make the navtree constructs available TTW
     allow_module('Products.CMFPlone.browser.navtree')
 
+    # Make the id validation available TTW
+    ModuleSecurityInfo('Products.CMFPlone.checkid').declarePublic(
+        'check_id', 'check_ids')
+
     # Allow access to the exception in the folder_delete script
     from OFS.ObjectManager import BeforeDeleteException
     allow_module('OFS.ObjectManager')
@@ -1,12 +1,19 @@
+from time import time
+
 from Acquisition import aq_inner
 from zope.interface import implements
 from zope.component import getMultiAdapter
 from zope.component import getUtility
 
+from plone.memoize import ram
+from plone.memoize.view import memoize
 from plone.registry.interfaces import IRegistry
 from Products.CMFPlone.interfaces import INavigationSchema
 
 from Acquisition import aq_base
+from Products.CMFCore.permissions import AccessInactivePortalContent
+from Products.CMFCore.utils import _checkPermission
+from Products.CMFCore.utils import _getAuthenticatedUser
 from Products.CMFCore.utils import getToolByName
 from Products.CMFPlone import utils
 from Products.Five import BrowserView
@@ -19,11 +26,11 @@ from Products.CMFPlone.interfaces import IHideFromBreadcrumbs
 
 from Products.CMFPlone.browser.navtree \
     import NavtreeQueryBuilder, SitemapQueryBuilder
+from Products.CMFPlone.browser.navtree import buildCachedFolderTree
 
 from plone.app.layout.navigation.interfaces import INavtreeStrategy
 
 from plone.app.layout.navigation.root import getNavigationRoot
-from plone.app.layout.navigation.navtree import buildFolderTree
 
 
 def get_url(item):
@@ -45,10 +52,12 @@ def get_id(item):
     return getId()
 
 
-def get_view_url(context):
-    props = getToolByName(context, 'portal_properties')
-    stp = props.site_properties
-    view_action_types = stp.getProperty('typesUseViewActionInListings', ())
+def get_view_url(context, view_action_types=None):
+    if view_action_types is None:
+        props = getToolByName(context, 'portal_properties')
+        stp = props.site_properties
+        view_action_types = stp.getProperty('typesUseViewActionInListings',
+                                            ())
 
     item_url = get_url(context)
     name = get_id(context)
@@ -103,8 +112,8 @@ class CatalogNavigationTree(BrowserView):
 
         strategy = getMultiAdapter((context, self), INavtreeStrategy)
 
-        return buildFolderTree(context, obj=context,
-                               query=query, strategy=strategy)
+        return buildCachedFolderTree(context, obj=context,
+                                     query=query, strategy=strategy)
 
 
 class CatalogSiteMap(BrowserView):
@@ -118,13 +127,76 @@ class CatalogSiteMap(BrowserView):
 
         strategy = getMultiAdapter((context, self), INavtreeStrategy)
 
-        return buildFolderTree(context, obj=context,
-                               query=query, strategy=strategy)
+        return buildCachedFolderTree(context, obj=context,
+                                     query=query, strategy=strategy)
+
+
+TABS_CACHE_INTERVAL = 60
+
+# Calls of topLevelTabs and computations of the content tabs
+_tabsStatistics = {'calls': 0, 'misses': 0}
+
+
+def tabsCacheStatistics():
+    """Return the hits and misses of the content tabs cache.
+    """
+    calls = _tabsStatistics['calls']
+    misses = _tabsStatistics['misses']
+    return {'hits': calls - misses, 'misses': misses}
+
+
+def _contentTabsCacheKey(fun, view, query, idsNotToList, view_action_types):
+    catalog = view.portal_catalog
+    counter = catalog.getCommittedCounter()
+    if counter is None:
+        raise ram.DontCache
+    user = _getAuthenticatedUser(catalog)
+    request = view.request
+    return (
+        request.physicalPathToURL(query['path']['query']),
+        repr(sorted(query.items())),
+        tuple(catalog._cachedAllowedRolesAndUsers(user)),
+        _checkPermission(AccessInactivePortalContent, catalog),
+        request.get('LANGUAGE', ''),
+        tuple(idsNotToList),
+        tuple(view_action_types),
+        counter,
+        int(time() / TABS_CACHE_INTERVAL),
+    )
+
+
+@ram.cache(_contentTabsCacheKey)
+def _contentTabs(view, query, idsNotToList, view_action_types):
+    """Return the content tabs with the remote url and creator of each
+    item, so links can be resolved for the current member.
+    """
+    _tabsStatistics['misses'] += 1
+    context = aq_inner(view.context)
+    tabs = []
+    for item in view.portal_catalog.searchResults(query):
+        if item.getId in idsNotToList or item.exclude_from_nav:
+            continue
+        id, item_url = get_view_url(item, view_action_types)
+        data = {'name': utils.pretty_title_or_id(context, item),
+                'id': item.getId,
+                'url': item_url,
+                'description': item.Description}
+        tabs.append((data, item.getRemoteUrl, item.Creator))
+    return tuple(tabs)
 
 
 class CatalogNavigationTabs(BrowserView):
     implements(INavigationTabs)
 
+    @memoize
+    def _navigationSettings(self):
+        registry = getUtility(IRegistry)
+        return registry.forInterface(
+            INavigationSchema,
+            prefix="plone",
+            check=False
+        )
+
     def _getNavQuery(self):
         context = self.context
         navtree_properties = self.navtree_properties
@@ -138,13 +210,7 @@ class CatalogNavigationTabs(BrowserView):
         rootPath = getNavigationRoot(context)
         query['path'] = {'query': rootPath, 'depth': 1}
 
-        registry = getUtility(IRegistry)
-        navigation_settings = registry.forInterface(
-            INavigationSchema,
-            prefix="plone",
-            check=False
-        )
-        displayed_types = navigation_settings.displayed_types
+        displayed_types = self._navigationSettings().displayed_types
         query['portal_type'] = [t for t in displayed_types]
 
         sortAttribute = navtree_properties.getProperty('sortAttribute', None)
@@ -194,36 +260,22 @@ class CatalogNavigationTabs(BrowserView):
                 result.append(data)
 
         # check whether we only want actions
-        registry = getUtility(IRegistry)
-        navigation_settings = registry.forInterface(
-            INavigationSchema,
-            prefix="plone",
-            check=False
-        )
-        if not navigation_settings.generate_tabs:
+        if not self._navigationSettings().generate_tabs:
             return result
 
         query = self._getNavQuery()
-
-        rawresult = self.portal_catalog.searchResults(query)
-
-        def get_link_url(item):
-            linkremote = item.getRemoteUrl and not member == item.Creator
-            if linkremote:
-                return (get_id(item), item.getRemoteUrl)
-            else:
-                return False
+        idsNotToList = self.navtree_properties.getProperty('idsNotToList', ())
+        view_action_types = self.site_properties.getProperty(
+            'typesUseViewActionInListings', ())
 
         # now add the content to results
-        idsNotToList = self.navtree_properties.getProperty('idsNotToList', ())
-        for item in rawresult:
-            if not (item.getId in idsNotToList or item.exclude_from_nav):
-                id, item_url = get_link_url(item) or get_view_url(item)
-                data = {'name': utils.pretty_title_or_id(context, item),
-                        'id': item.getId,
-                        'url': item_url,
-                        'description': item.Description}
-                result.append(data)
+        _tabsStatistics['calls'] += 1
+        tabs = _contentTabs(self, query, idsNotToList, view_action_types)
+        for data, remote_url, creator in tabs:
+            data = data.copy()
+            if remote_url and not member == creator:
+                data['url'] = remote_url
+            result.append(data)
 
         return result
 
@@ -3,6 +3,8 @@
 # strategy/filtering method that uses Plone's navtree_properties to construct
 # navtrees.
 
+from time import time
+
 from zope.interface import implements
 from zope.component import getMultiAdapter, queryUtility
 
@@ -10,12 +12,18 @@ from plone.app.layout.navigation.interfaces import INavigationQueryBuilder
 from plone.app.layout.navigation.interfaces import INavtreeStrategy
 
 from plone.app.layout.navigation.navtree import NavtreeStrategyBase
+from plone.app.layout.navigation.navtree import buildFolderTree
 from plone.app.layout.navigation.root import getNavigationRoot
 
 from plone.i18n.normalizer.interfaces import IIDNormalizer
+from plone.memoize import ram
 
 from AccessControl import ModuleSecurityInfo
+from Acquisition import aq_base
 from Acquisition import aq_inner
+from Products.CMFCore.permissions import AccessInactivePortalContent
+from Products.CMFCore.utils import _checkPermission
+from Products.CMFCore.utils import _getAuthenticatedUser
 from Products.CMFCore.utils import getToolByName
 from Products.CMFPlone import utils
 
@@ -130,6 +138,16 @@ class SitemapNavtreeStrategy(NavtreeStrategyBase):
         membership = getToolByName(context, 'portal_membership')
         self.memberId = membership.getAuthenticatedMember().getId()
 
+        self._layout_view = None
+        self._idnormalizer = None
+
+    def cacheKey(self):
+        """Settings that influence the shape of the tree, see
+        buildCachedFolderTree.
+        """
+        return (self.__class__.__name__, self.rootPath, self.showAllParents,
+                tuple(sorted(self.excludedIds)), tuple(self.parentTypesNQ))
+
     def nodeFilter(self, node):
         item = node['item']
         if getattr(item, 'getId', None) in self.excludedIds:
@@ -170,7 +188,10 @@ class SitemapNavtreeStrategy(NavtreeStrategyBase):
                 (portalType is None or portalType not in self.parentTypesNQ):
             showChildren = True
 
-        layout_view = getMultiAdapter((context, request), name=u'plone_layout')
+        layout_view = self._layout_view
+        if layout_view is None:
+            layout_view = self._layout_view = getMultiAdapter(
+                (context, request), name=u'plone_layout')
 
         newNode['Title'] = utils.pretty_title_or_id(context, item)
         newNode['id'] = item.getId
@@ -192,7 +213,9 @@ class SitemapNavtreeStrategy(NavtreeStrategyBase):
         newNode['link_remote'] = newNode['getRemoteUrl'] \
                                  and newNode['Creator'] != self.memberId
 
-        idnormalizer = queryUtility(IIDNormalizer)
+        idnormalizer = self._idnormalizer
+        if idnormalizer is None:
+            idnormalizer = self._idnormalizer = queryUtility(IIDNormalizer)
         newNode['normalized_portal_type'] = idnormalizer.normalize(portalType)
         newNode['normalized_review_state'] = \
             idnormalizer.normalize(newNode['review_state'])
@@ -226,6 +249,9 @@ class DefaultNavtreeStrategy(SitemapNavtreeStrategy):
         else:
             self.rootPath = getNavigationRoot(context)
 
+    def cacheKey(self):
+        return SitemapNavtreeStrategy.cacheKey(self) + (self.bottomLevel, )
+
     def subtreeFilter(self, node):
         sitemapDecision = SitemapNavtreeStrategy.subtreeFilter(self, node)
         if sitemapDecision == False:
@@ -235,3 +261,88 @@ class DefaultNavtreeStrategy(SitemapNavtreeStrategy):
             return False
         else:
             return True
+
+
+# Seconds a cached tree is used at most, so items becoming effective or
+# expired show up without a catalog change.
+TREE_CACHE_INTERVAL = 60
+_DECORATE = '_decorate'
+
+
+class _SnapshotStrategy(object):
+    """Builds an undecorated tree on behalf of another strategy, nodes are
+    decorated when the tree is taken from the cache.
+    """
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+
+    def __getattr__(self, name):
+        return getattr(self.strategy, name)
+
+    def decoratorFactory(self, node):
+        node = node.copy()
+        node[_DECORATE] = True
+        return node
+
+
+def _snapshot(node):
+    # Keep no acquisition wrappers, they refer to the request
+    node = node.copy()
+    if node.get('item') is not None:
+        node['item'] = aq_base(node['item'])
+    node['children'] = [
+        _snapshot(child) for child in node.get('children', [])]
+    return node
+
+
+def _restore(node, catalog, strategy):
+    node = node.copy()
+    if node.get('item') is not None:
+        node['item'] = node['item'].__of__(catalog)
+    node['children'] = [_restore(child, catalog, strategy)
+                        for child in node.get('children', [])]
+    if node.pop(_DECORATE, False):
+        node = strategy.decoratorFactory(node)
+    return node
+
+
+def _folderTreeCacheKey(fun, context, obj, query, strategy):
+    catalog = getToolByName(context, 'portal_catalog')
+    counter = catalog.getCommittedCounter()
+    if counter is None:
+        raise ram.DontCache
+    user = _getAuthenticatedUser(catalog)
+    request = getattr(context, 'REQUEST', None)
+    return (
+        '/'.join(context.getPhysicalPath()),
+        obj is not None and '/'.join(obj.getPhysicalPath()),
+        repr(sorted(query.items())),
+        tuple(catalog._cachedAllowedRolesAndUsers(user)),
+        _checkPermission(AccessInactivePortalContent, catalog),
+        request is not None and request.get('LANGUAGE', '') or '',
+        counter,
+        int(time() / TREE_CACHE_INTERVAL),
+        strategy.cacheKey(),
+    )
+
+
+@ram.cache(_folderTreeCacheKey)
+def _buildFolderTreeSnapshot(context, obj, query, strategy):
+    return _snapshot(buildFolderTree(context, obj=obj, query=query,
+                                     strategy=_SnapshotStrategy(strategy)))
+
+
+def buildCachedFolderTree(context, obj=None, query={}, strategy=None):
+    """Like buildFolderTree, but reuse the tree for requests with the same
+    catalog state, security filter and settings.
+
+    Only the nodes are decorated per request.  Strategies that do not
+    provide a cacheKey method are not cached.
+    """
+    if getattr(strategy, 'cacheKey', None) is None:
+        return buildFolderTree(context, obj=obj, query=query,
+                               strategy=strategy)
+    catalog = getToolByName(context, 'portal_catalog')
+    tree = _buildFolderTreeSnapshot(context, obj, query, strategy)
+    return _restore(tree, catalog, strategy)
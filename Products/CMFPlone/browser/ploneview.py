@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
+from AccessControl import getSecurityManager
 from Acquisition import aq_inner
+from plone.dexterity.content import Container
 from plone.memoize.view import memoize
+from Products.CMFCore.PortalFolder import PortalFolderBase
 from Products.CMFCore.utils import getToolByName
 from Products.CMFPlone import utils
 from Products.CMFPlone.browser.interfaces import IPlone
+from Products.CMFPlone.interfaces import IConstrainTypes
 from Products.Five import BrowserView
+from zope.annotation.interfaces import IAnnotations
 from zope.component import getMultiAdapter
 from zope.deprecation import deprecate
 from zope.i18n import translate
@@ -13,6 +18,44 @@ from zope.size import byteDisplay
 
 _marker = []
 
+TOOLBAR_KEY = 'Products.CMFPlone.browser.ploneview.showToolbar'
+
+# allowedContentTypes implementations that only filter the types tool
+_GENERIC_ALLOWED_TYPES = (
+    PortalFolderBase.allowedContentTypes.im_func,
+    Container.allowedContentTypes.im_func,
+)
+
+
+def hasAddableTypes(context):
+    """Tell if any type can be added to context.
+
+    Like bool(context.allowedContentTypes()), but stops at the first
+    addable type for containers without type constraints.
+    """
+    allowed = context.allowedContentTypes
+    # The method may be acquired from a parent folder
+    folder = getattr(allowed, 'im_self', context)
+    if getattr(allowed, 'im_func', None) not in _GENERIC_ALLOWED_TYPES or \
+            IConstrainTypes(folder, None) is not None:
+        return bool(allowed())
+    portal_types = getToolByName(folder, 'portal_types')
+    myType = portal_types.getTypeInfo(folder)
+    for fti in portal_types.listTypeInfo():
+        if myType is not None and not myType.allowType(fti.getId()):
+            continue
+        if fti.isConstructionAllowed(folder):
+            return True
+    return False
+
+
+def invalidateToolbar(request):
+    """Forget the showToolbar results memoized on the request.
+    """
+    annotations = IAnnotations(request, None)
+    if annotations is not None:
+        annotations.pop(TOOLBAR_KEY, None)
+
 
 @implementer(IPlone)
 class Plone(BrowserView):
@@ -56,9 +99,10 @@ class Plone(BrowserView):
             return user.getProperty('visible_ids', False)
         return False
 
-    # This can't be request-memoized, because it won't necessarily remain
-    # valid across traversals. For example, you may get tabs on an error
-    # message.
+    # This can't be memoized on the view only, because it won't necessarily
+    # remain valid across traversals. For example, you may get tabs on an
+    # error message. The result is memoized on the request for the context,
+    # the published object and the user.
     def showToolbar(self):
         """Determine if the editable border should be shown
         """
@@ -69,6 +113,23 @@ class Plone(BrowserView):
             return True
 
         context = aq_inner(self.context)
+        annotations = IAnnotations(request, None)
+        if annotations is None:
+            return self._showToolbar(context)
+        cache = annotations.setdefault(TOOLBAR_KEY, {})
+        published = request.get('PUBLISHED')
+        user = getSecurityManager().getUser()
+        key = (context.getPhysicalPath(), id(published), id(user))
+        cached = cache.get(key)
+        # Keep the published object and user, so their ids can not be reused
+        if cached is None or cached[0] is not published or \
+                cached[1] is not user:
+            cached = (published, user, self._showToolbar(context))
+            cache[key] = cached
+        return cached[2]
+
+    def _showToolbar(self, context):
+        request = self.request
 
         portal_membership = getToolByName(context, 'portal_membership')
         checkPerm = portal_membership.checkPermission
@@ -113,11 +174,7 @@ class Plone(BrowserView):
                 return True
 
         # Check to see if the user is able to add content
-        allowedTypes = context.allowedContentTypes()
-        if allowedTypes:
-            return True
-
-        return False
+        return hasAddableTypes(context)
 
     @deprecate('showEditableBorder is renamed to showToolbar')
     def showEditableBorder(self):
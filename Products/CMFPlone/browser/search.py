@@ -2,11 +2,17 @@
 
 from DateTime import DateTime
 from plone.app.contentlisting.interfaces import IContentListing
+from plone.app.layout.navigation.interfaces import INavigationRoot
+from plone.registry.interfaces import IRegistry
 from Products.CMFCore.utils import getToolByName
+from Products.CMFPlone import utils
+from Products.CMFPlone.browser.navigation import get_view_url
 from Products.CMFPlone.browser.navtree import getNavigationRoot
+from Products.CMFPlone.interfaces import IHideFromBreadcrumbs
 from Products.CMFPlone.PloneBatch import Batch
 from Products.ZCTextIndex.ParseTree import ParseError
 from zope.component import getMultiAdapter
+from zope.component import getUtility
 from zope.i18nmessageid import MessageFactory
 from zope.publisher.browser import BrowserView
 from ZTUtils import make_query
@@ -166,11 +172,91 @@ class Search(BrowserView):
             query = query + '&advanced_search=True'
         return url + '?' + query
 
+    def _crumbs_info(self, paths):
+        """Breadcrumb data for the given paths, from catalog metadata.
+        Paths that are not cataloged map to None.
+
+        The data is kept on the view, results share most of their parents.
+        """
+        if not hasattr(self, '_crumbs_cache'):
+            self._crumbs_cache = {}
+        cache = self._crumbs_cache
+        missing = [path for path in paths if path not in cache]
+        if missing:
+            catalog = getToolByName(self.context, 'portal_catalog')
+            indexes = catalog._catalog.indexes
+            provides = indexes['object_provides']
+            default_page = indexes['is_default_page']
+            query = {'path': {'query': missing, 'depth': 0}}
+            for brain in catalog.unrestrictedSearchResults(query):
+                rid = brain.getRID()
+                interfaces = provides.getEntryForObject(rid, ()) or ()
+                id, url = get_view_url(brain)
+                cache[brain.getPath()] = {
+                    'absolute_url': url,
+                    'Title': utils.pretty_title_or_id(self.context, brain),
+                    'hide': IHideFromBreadcrumbs.__identifier__ in interfaces,
+                    'root': INavigationRoot.__identifier__ in interfaces,
+                    'default_page': bool(
+                        default_page.getEntryForObject(rid, False)),
+                }
+            for path in missing:
+                cache.setdefault(path, None)
+        return [cache[path] for path in paths]
+
+    def _catalog_breadcrumbs(self, path):
+        """Compute the breadcrumbs of the breadcrumbs_view for the object
+        at path without waking up any object.
+
+        Returns None when a parent is not cataloged.
+        """
+        if not hasattr(self, '_portal_path'):
+            portal_url = getToolByName(self.context, 'portal_url')
+            self._portal_path = portal_url.getPortalPath()
+            root = getUtility(IRegistry).get('plone.root', None)
+            self._relative_root = None
+            if root and root != '/':
+                if root[0] != '/':
+                    root = '/' + root
+                self._relative_root = self._portal_path + root
+        portal_path = self._portal_path
+        if not path.startswith(portal_path + '/'):
+            return None
+        elements = path[len(portal_path) + 1:].split('/')
+        paths = [portal_path + '/' + '/'.join(elements[:i + 1])
+                 for i in range(len(elements))]
+        infos = self._crumbs_info(paths)
+        if None in infos:
+            return None
+
+        # Navigation roots start a new breadcrumbs trail
+        start = 0
+        root_path = portal_path
+        for i, info in enumerate(infos):
+            if info['root']:
+                start = i + 1
+                root_path = paths[i]
+        if self._relative_root is not None:
+            root_path = self._relative_root
+
+        breadcrumbs = []
+        for item_path, info in zip(paths, infos)[start:]:
+            if info['hide'] or info['default_page'] or \
+                    root_path.startswith(item_path):
+                continue
+            breadcrumbs.append({'absolute_url': info['absolute_url'],
+                                'Title': info['Title']})
+        return breadcrumbs
+
     def breadcrumbs(self, item):
-        obj = item.getObject()
-        view = getMultiAdapter((obj, self.request), name='breadcrumbs_view')
+        breadcrumbs = self._catalog_breadcrumbs(item.getPath())
+        if breadcrumbs is None:
+            obj = item.getObject()
+            view = getMultiAdapter((obj, self.request),
+                                   name='breadcrumbs_view')
+            breadcrumbs = list(view.breadcrumbs())
         # cut off the item itself
-        breadcrumbs = list(view.breadcrumbs())[:-1]
+        breadcrumbs = breadcrumbs[:-1]
         if len(breadcrumbs) == 0:
             # don't show breadcrumbs if we only have a single element
             return None
@@ -1,10 +1,31 @@
 from Products.CMFPlone.interfaces import ISiteSchema
+from hashlib import md5
 from plone.formwidget.namedfile.converter import b64decode_file
 from plone.namedfile.browser import Download
 from plone.namedfile.file import NamedImage
 from plone.registry.interfaces import IRegistry
 from zope.component import getUtility
 
+# Decoded logos by digest of the registry value
+_logos = {}
+LOGO_CACHE_SIZE = 10
+
+
+def getDecodedLogo(value):
+    """Return the filename, image and etag of a site_logo registry value.
+    The value is only decoded the first time.
+    """
+    digest = md5(value).hexdigest()
+    logo = _logos.get(digest)
+    if logo is None:
+        filename, data = b64decode_file(value)
+        logo = (filename, NamedImage(data=data, filename=filename),
+                '"%s"' % digest)
+        if len(_logos) >= LOGO_CACHE_SIZE:
+            _logos.clear()
+        _logos[digest] = logo
+    return logo
+
 
 class SiteLogo(Download):
 
@@ -12,15 +33,34 @@ class SiteLogo(Download):
         super(SiteLogo, self).__init__(context, request)
         self.filename = None
         self.data = None
+        self.etag = None
 
         registry = getUtility(IRegistry)
         settings = registry.forInterface(ISiteSchema, prefix="plone")
         if getattr(settings, 'site_logo', False):
-            filename, data = b64decode_file(settings.site_logo)
-            data = NamedImage(data=data, filename=filename)
-            self.data = data
-            self.filename = filename
+            self.filename, self.data, self.etag = getDecodedLogo(
+                settings.site_logo)
             # self.width, self.height = self.data.getImageSize()
 
+    def __call__(self):
+        if self.data is not None:
+            response = self.request.response
+            # The registry keeps no modification time of the logo, the
+            # ETag alone identifies it.
+            response.setHeader('ETag', self.etag)
+            if self._notModified():
+                response.setStatus(304)
+                return ''
+        return super(SiteLogo, self).__call__()
+
+    def _notModified(self):
+        """Tell if the client already has the current logo.
+        """
+        if_none_match = self.request.get_header('If-None-Match', None)
+        if if_none_match is None:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return self.etag in tags or '*' in tags
+
     def _getFile(self):
         return self.data
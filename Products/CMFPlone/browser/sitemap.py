@@ -1,3 +1,5 @@
+from cgi import escape
+
 from Acquisition import aq_inner
 from zope.component import getMultiAdapter
 from zope.interface import implements
@@ -6,30 +8,88 @@ from Products.Five import BrowserView
 from Products.Five.browser.pagetemplatefile import ViewPageTemplateFile
 
 from Products.CMFPlone.browser.interfaces import ISitemapView
+from Products.CMFPlone.utils import safe_unicode
+
+ITEM_FRAGMENT = (
+    u'<a href="%(url)s"%(title_attr)s class="%(class)s">\n'
+    u'    %(icon)s\n'
+    u'    <span>%(title)s</span>\n'
+    u'  </a>\n'
+)
+ITEM_TEMPLATE = ViewPageTemplateFile('templates/sitemap-item.pt')
+_ITEM_TEMPLATE_FILENAME = ITEM_TEMPLATE.filename
+
+
+def _quote(value):
+    return escape(safe_unicode(value), True)
 
 
 class SitemapView(BrowserView):
     implements(ISitemapView)
 
-    item_template = ViewPageTemplateFile('templates/sitemap-item.pt')
+    # Only rendered when customized, see _itemRenderer
+    item_template = ITEM_TEMPLATE
 
     def createSiteMap(self):
+        return u''.join(self.iterSiteMap())
+
+    def iterSiteMap(self):
+        """Yield the sitemap markup in chunks, so it can be written to the
+        response while the tree is walked.
+        """
         context = aq_inner(self.context)
         view = getMultiAdapter((context, self.request),
                                name='sitemap_builder_view')
         data = view.siteMap()
-        return self._renderLevel(children=data.get('children', []))
+        return self._renderLevel(children=data.get('children', []),
+                                 render=self._itemRenderer())
+
+    def _itemRenderer(self):
+        """Return renderItem, or the item template when a subclass or a
+        template override (z3c.jbot) customizes it.
+        """
+        template = getattr(self.item_template, 'im_func', None)
+        if template is ITEM_TEMPLATE:
+            # Overrides only swap the file when the template is checked
+            template._cook_check()
+            if template.filename == _ITEM_TEMPLATE_FILENAME:
+                return self.renderItem
+        return lambda node: self.item_template(node=node)
 
-    def _renderLevel(self, children=[], level=2):
-        output = ''
+    def renderItem(self, node):
+        """Render the link of a single sitemap node.
+        """
+        url = node['getURL']
+        if node.get('useRemoteUrl') and node['getRemoteUrl']:
+            url = node['getRemoteUrl']
+        item_class = u'state-%s contenttype-%s' % (
+            node['normalized_review_state'], node['normalized_portal_type'])
+        if node['currentItem']:
+            item_class += u' navTreeCurrentItem'
+        description = node['Description']
+        title_attr = u''
+        if description is not None:
+            title_attr = u' title="%s"' % _quote(description)
+        html_tag = getattr(node['item_icon'], 'html_tag', None)
+        icon = html_tag is not None and html_tag() or u''
+        return ITEM_FRAGMENT % {
+            'url': _quote(url),
+            'title_attr': title_attr,
+            'class': _quote(item_class),
+            'icon': safe_unicode(icon),
+            'title': _quote(node['Title']),
+        }
+
+    def _renderLevel(self, children=[], level=2, render=None):
+        if render is None:
+            render = self._itemRenderer()
         for node in children:
-            output += '<li class="navTreeItem visualNoMarker">\n'
-            output += self.item_template(node=node)
+            yield u'<li class="navTreeItem visualNoMarker">\n'
+            yield render(node)
             children = node.get('children', [])
             if len(children):
-                output += \
-                    '<ul class="navTree navTreeLevel%d">\n%s\n</ul>\n' % (
-                        level, self._renderLevel(children, level+1))
-            output += '</li>\n'
-
-        return output
+                yield u'<ul class="navTree navTreeLevel%d">\n' % level
+                for chunk in self._renderLevel(children, level + 1, render):
+                    yield chunk
+                yield u'\n</ul>\n'
+            yield u'</li>\n'
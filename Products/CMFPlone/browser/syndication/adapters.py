@@ -8,6 +8,7 @@ from DateTime import DateTime
 from OFS.interfaces import IItem
 
 from Products.CMFCore.utils import getToolByName
+from Products.ZCatalog.Lazy import LazyMap
 
 from Products.CMFPlone.interfaces.syndication import IFeed
 from Products.CMFPlone.interfaces.syndication import IFeedItem
@@ -32,6 +33,10 @@ except ImportError:
         pass
 
 
+def _getObject(brain):
+    return brain.getObject()
+
+
 class BaseFeedData(object):
 
     def __init__(self, context):
@@ -136,9 +141,9 @@ class FolderFeed(BaseFeedData):
 
     def _items(self):
         """
-        do catalog query
+        do catalog query, objects are only loaded for the items used
         """
-        return [b.getObject() for b in self._brains()]
+        return LazyMap(_getObject, self._brains())
 
     @property
     def items(self):
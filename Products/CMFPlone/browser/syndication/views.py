@@ -1,15 +1,57 @@
+from time import time
+
 from zope.component import queryAdapter
 from zope.component import getMultiAdapter
+from zope.component import getUtility
+from Products.CMFCore.utils import getToolByName
 from Products.Five import BrowserView
 from zExceptions import NotFound
 
 from Products.CMFPlone.interfaces.syndication import ISearchFeed
 from Products.CMFPlone.interfaces.syndication import IFeed
 from Products.CMFPlone.interfaces.syndication import IFeedSettings
+from Products.CMFPlone.interfaces.syndication import ISiteSyndicationSettings
 from Products.CMFPlone import PloneMessageFactory as _
 
 from z3c.form import form, button, field
 from plone.app.z3cform.layout import wrap_form
+from plone.memoize import ram
+from plone.registry.interfaces import IRegistry
+
+FEED_CACHE_INTERVAL = 60
+
+
+def _renderFeedCacheKey(fun, view):
+    """Rendered feeds are shared between anonymous requests for the same
+    url, catalog state and syndication settings.
+    """
+    context = view.context
+    membership = getToolByName(context, 'portal_membership')
+    if not membership.isAnonymousUser():
+        raise ram.DontCache
+    counter = getToolByName(context, 'portal_catalog').getCommittedCounter()
+    if counter is None:
+        raise ram.DontCache
+    settings = IFeedSettings(context)
+    site_settings = getUtility(IRegistry).forInterface(
+        ISiteSyndicationSettings)
+    request = view.request
+    return (
+        view.__name__,
+        request.get('ACTUAL_URL'),
+        request.get('QUERY_STRING'),
+        request.get('LANGUAGE', ''),
+        counter,
+        int(time() / FEED_CACHE_INTERVAL),
+        [getattr(settings, name, None) for name in IFeedSettings.names()],
+        [getattr(site_settings, name, None)
+         for name in ISiteSyndicationSettings.names()],
+    )
+
+
+@ram.cache(_renderFeedCacheKey)
+def _renderFeed(view):
+    return view.index()
 
 
 class FeedView(BrowserView):
@@ -31,7 +73,7 @@ class FeedView(BrowserView):
                 raise NotFound
             self.request.response.setHeader('Content-Type',
                                             'application/atom+xml')
-            return self.index()
+            return _renderFeed(self)
 
 
 class SearchFeedView(FeedView):
@@ -47,7 +89,7 @@ class SearchFeedView(FeedView):
         if util.search_rss_enabled(raise404=True):
             self.request.response.setHeader('Content-Type',
                                             'application/atom+xml')
-            return self.index()
+            return _renderFeed(self)
 
 
 class SettingsForm(form.EditForm):
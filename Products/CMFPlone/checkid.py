@@ -0,0 +1,259 @@
+"""Validation of content ids.
+
+``check_id`` holds the checks of the check_id skin script, which calls it.
+``check_ids`` validates many ids for one container, doing the lookups that
+do not depend on the id only once.
+
+Attributes are accessed with guarded_getattr where the skin script relied
+on restricted code, so the proxy roles of a calling script still decide
+which checks are skipped.
+"""
+from AccessControl import Unauthorized
+from AccessControl.ZopeGuards import guarded_getattr
+from Acquisition import aq_base
+from Acquisition import aq_inner
+from Acquisition import aq_parent
+from Products.CMFCore.utils import getToolByName
+from Products.CMFPlone import PloneMessageFactory as _
+from Products.CMFPlone.utils import base_hasattr
+from ZODB.POSException import ConflictError
+
+# Ids refused everywhere
+RESERVED_IDS = frozenset(('login', 'layout', 'plone', 'zip', 'properties'))
+
+
+def reservedCatalogNames(catalog):
+    """Return the names of the catalog indexes and metadata columns.
+
+    The set is kept on the catalog until a column or an index is added or
+    removed.  Other threads load the changed catalog without it.
+    """
+    _catalog = catalog._catalog
+    names = _catalog.names
+    indexes = tuple(sorted(_catalog.indexes.keys()))
+    cached = getattr(_catalog, '_v_reserved_names', None)
+    if cached is None or cached[0] is not names or cached[1] != indexes:
+        reserved = frozenset(indexes) | frozenset(catalog.schema())
+        cached = (names, indexes, reserved)
+        _catalog._v_reserved_names = cached
+    return cached[2]
+
+
+class _IdChecker(object):
+    """The checks of check_id, with what does not depend on the id looked
+    up once.
+    """
+
+    def __init__(self, context):
+        self.context = context
+        # http://dev.plone.org/plone/ticket/10518#comment:7
+        self.ts = getToolByName(context, 'translation_service')
+        self.plone_utils = getToolByName(context, 'plone_utils', None)
+        self.catalog_names = None
+        catalog = getToolByName(context, 'portal_catalog', None)
+        if catalog is not None:
+            try:
+                guarded_getattr(catalog, 'indexes')
+                guarded_getattr(catalog, 'schema')
+            except Unauthorized:
+                # ignore if we don't have permission; will get picked up at
+                # the end
+                pass
+            else:
+                self.catalog_names = reservedCatalogNames(catalog)
+        self._aliases = {}
+        self._portal = None
+
+    def xlate(self, message):
+        return self.ts.translate(message, context=self.context.REQUEST)
+
+    def reserved(self, id):
+        return self.xlate(_(u'${name} is reserved.', mapping={u'name': id}))
+
+    def taken(self, id):
+        return self.xlate(
+            _(u'There is already an item named ${name} in this folder.',
+              mapping={u'name': id}))
+
+    def checkId(self, id):
+        """Basic id validation, regardless of the container.
+        """
+        # check for reserved names
+        if id in RESERVED_IDS:
+            return self.reserved(id)
+
+        # check for bad characters
+        if self.plone_utils is not None:
+            bad_chars = self.plone_utils.bad_chars(id)
+            if len(bad_chars) > 0:
+                bad_chars = ''.join(bad_chars).decode('utf-8')
+                decoded_id = id.decode('utf-8')
+                return self.xlate(
+                    _(u'${name} is not a legal name. The following '
+                      u'characters are invalid: ${characters}',
+                      mapping={u'name': decoded_id,
+                               u'characters': bad_chars}))
+
+        # check for a catalog index or column
+        if self.catalog_names is not None and id in self.catalog_names:
+            return self.reserved(id)
+
+    def _methodAliases(self, container):
+        """Return the method aliases of the type of container.
+        """
+        key = id(aq_base(container))
+        cached = self._aliases.get(key)
+        if cached is None:
+            aliases = ()
+            portal_types = getToolByName(self.context, 'portal_types', None)
+            if self.plone_utils is not None and portal_types is not None:
+                parentFti = portal_types.getTypeInfo(container)
+                if parentFti is not None:
+                    aliases = self.plone_utils.getMethodAliases(parentFti)
+                    aliases = aliases is not None and aliases.keys() or ()
+            # Keep the container, so its id can not be reused
+            cached = (container, frozenset(aliases))
+            self._aliases[key] = cached
+        return cached[1]
+
+    def _portalContent(self):
+        """Return the portal and the ids of its content.
+        """
+        if self._portal is None:
+            portal = getToolByName(
+                self.context, 'portal_url').getPortalObject()
+            content_ids = guarded_getattr(portal, 'contentIds')()
+            self._portal = (portal, frozenset(content_ids))
+        return self._portal
+
+    def checkCollision(self, id, container):
+        """Check that id is free in container.
+        """
+        # Check for an existing object.
+        if id in container:
+            try:
+                existing_obj = guarded_getattr(container, id, None)
+                if base_hasattr(existing_obj, 'portal_type'):
+                    return self.taken(id)
+            except Unauthorized:
+                # we can't access the object: safe to assume we can't
+                # replace it
+                return self.taken(id)
+
+        if base_hasattr(container, 'checkIdAvailable'):
+            try:
+                if not guarded_getattr(container, 'checkIdAvailable')(id):
+                    return self.reserved(id)
+            except Unauthorized:
+                pass  # ignore if we don't have permission
+
+        # containers may implement this hook to further restrict ids
+        if base_hasattr(container, 'checkValidId'):
+            try:
+                guarded_getattr(container, 'checkValidId')(id)
+            except Unauthorized:
+                raise
+            except ConflictError:
+                raise
+            except:
+                return self.reserved(id)
+
+        # make sure we don't collide with any parent method aliases
+        if id in self._methodAliases(container):
+            return self.reserved(id)
+
+        # Lastly, we want to disallow the id of any of the tools in the
+        # portal root, as well as any object that can be acquired via
+        # portal_skins.  However, we do want to allow overriding of
+        # *content* in the object's parent path, including the portal root.
+        if id == 'index_html':  # always allow index_html
+            return
+        portal, content_ids = self._portalContent()
+        if id not in content_ids:  # can override root *content*
+            try:
+                # it is allowed to give an object the same id as another
+                # container in it's acquisition path as long as the
+                # object is outside the portal
+                outsideportal = guarded_getattr(aq_parent(portal), id, None)
+                insideportal = guarded_getattr(portal, id, None)
+                if (insideportal is not None
+                        and outsideportal is not None
+                        and aq_base(outsideportal) == aq_base(insideportal)):
+                    return
+                # but not other things
+                if insideportal is not None:
+                    return self.reserved(id)
+            except Unauthorized:
+                pass  # ignore if we don't have permission
+
+
+def check_id(context, id=None, required=0, alternative_id=None,
+             contained_by=None):
+    """Test an id to make sure it is valid.
+
+    Returns an error message if the id is bad or None if the id is good.
+    See the check_id skin script for the parameters.
+    """
+    # if an alternative id has been supplied, see if we need to use it
+    if alternative_id and not id:
+        id = alternative_id
+
+    # make sure we have an id if one is required
+    if not id:
+        if required:
+            return _(u'Please enter a name.')
+
+        # Id is not required and no alternative was specified, so assume the
+        # object's id will be context.getId(). We still should check to make
+        # sure context.getId() is OK to handle the case of pre-created
+        # objects constructed via portal_factory.  The main potential problem
+        # is an id collision, e.g. if portal_factory autogenerates an id that
+        # already exists.
+        id = context.getId()
+
+    checker = _IdChecker(context)
+    error = checker.checkId(id)
+    if error is not None:
+        return error
+
+    # id is good; decide if we should check for id collisions
+    portal_factory = getToolByName(context, 'portal_factory', None)
+    if contained_by is not None:
+        # always check for collisions if a container was passed
+        checkForCollision = True
+    elif portal_factory is not None and portal_factory.isTemporary(context):
+        # always check for collisions if we are creating a new object
+        checkForCollision = True
+        contained_by = aq_parent(aq_parent(aq_parent(aq_inner(context))))
+    else:
+        # if we have an existing object, only check for collisions
+        # if we are changing the id
+        checkForCollision = (context.getId() != id)
+
+    if not checkForCollision:
+        return
+    # handles two use cases:
+    # 1. object has not yet been created and we don't know where it will be
+    # 2. object has been created and checking validity of id within container
+    if contained_by is None:
+        try:
+            contained_by = guarded_getattr(context, 'getParentNode')()
+        except Unauthorized:
+            return  # nothing we can do
+    return checker.checkCollision(id, contained_by)
+
+
+def check_ids(container, ids):
+    """Validate ids of new items in container.
+
+    Returns a dictionary of the invalid ids and their error messages.
+    """
+    checker = _IdChecker(container)
+    errors = {}
+    for id in ids:
+        error = checker.checkId(id)
+        if error is None:
+            error = checker.checkCollision(id, container)
+        if error is not None:
+            errors[id] = error
+    return errors
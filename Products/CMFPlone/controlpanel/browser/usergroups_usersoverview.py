@@ -4,6 +4,8 @@ from zExceptions import Forbidden
 from itertools import chain
 
 from Products.PluggableAuthService.interfaces.plugins import IRolesPlugin
+from Products.ZCatalog.Lazy import LazyMap
+from zope.annotation.interfaces import IAnnotations
 from zope.component import getUtility
 from plone.protect import CheckAuthenticator
 from zope.component import getMultiAdapter
@@ -17,6 +19,9 @@ from Products.CMFPlone.controlpanel.browser.usergroups import \
 
 logger = logging.getLogger('Products.CMFPlone')
 
+# Roles of principals found by the users overview, kept on the request
+ROLES_KEY = 'Products.CMFPlone.controlpanel.usersoverview.roles'
+
 
 class UsersOverviewControlPanel(UsersGroupsControlPanelView):
 
@@ -46,89 +51,106 @@ class UsersOverviewControlPanel(UsersGroupsControlPanelView):
         return self.index()
 
     def doSearch(self, searchString):
-        acl = getToolByName(self, 'acl_users')
-        rolemakers = acl.plugins.listPlugins(IRolesPlugin)
-
-        mtool = getToolByName(self, 'portal_membership')
+        """Search users by login, full name and email.
 
+        The plugin results are merged once and sorted by full name, users
+        without a principal object are left out.  The roles and
+        capabilities of a user are only looked up when the item is
+        accessed, which the template does for the current batch only.
+        """
         searchView = getMultiAdapter((
             aq_inner(self.context),
             self.request
         ), name='pas_search')
-
-        # First, search for all inherited roles assigned to each group.
-        # We push this in the request so that IRoles plugins are told provide
-        # the roles inherited from the groups to which the principal belongs.
-        self.request.set('__ignore_group_roles__', False)
-        self.request.set('__ignore_direct_roles__', True)
-        inheritance_enabled_users = searchView.merge(
-            chain(*[searchView.searchUsers(**{field: searchString}) for field in ['login', 'fullname', 'email']]), 'userid')
-        allInheritedRoles = {}
-        for user_info in inheritance_enabled_users:
-            userId = user_info['id']
-            user = acl.getUserById(userId)
-            # play safe, though this should never happen
-            if user is None:
-                logger.warn('Skipped user without principal object: %s' % userId)
+        mtool = getToolByName(self, 'portal_membership')
+        user_infos = []
+        merged = {}
+        members = {}
+        results = chain(*[searchView.searchUsers(**{field: searchString})
+                          for field in ['login', 'fullname', 'email']])
+        for user_info in results:
+            userId = user_info['userid']
+            if userId in merged:
+                # the values of the first result win, like in pas_search
+                for key, value in user_info.items():
+                    merged[userId].setdefault(key, value)
                 continue
-            allAssignedRoles = []
-            for rolemaker_id, rolemaker in rolemakers:
-                allAssignedRoles.extend(rolemaker.getRolesForPrincipal(user))
-            allInheritedRoles[userId] = allAssignedRoles
-
-        # We push this in the request such IRoles plugins don't provide
-        # the roles from the groups the principal belongs.
-        self.request.set('__ignore_group_roles__', True)
-        self.request.set('__ignore_direct_roles__', False)
-        explicit_users = searchView.merge(
-            chain(*[searchView.searchUsers(**{field: searchString}) for field in ['login', 'fullname', 'email']]), 'userid'
-        )
-
-        # Tack on some extra data, including whether each role is explicitly
-        # assigned ('explicit'), inherited ('inherited'), or not assigned at
-        # all (None).
-        results = []
-        for user_info in explicit_users:
-            userId = user_info['id']
+            merged[userId] = user_info.copy()
             user = mtool.getMemberById(userId)
             # play safe, though this should never happen
             if user is None:
-                logger.warn('Skipped user without principal object: %s' % userId)
+                logger.warn(
+                    'Skipped user without principal object: %s' % userId)
                 continue
-            explicitlyAssignedRoles = []
-            for rolemaker_id, rolemaker in rolemakers:
-                explicitlyAssignedRoles.extend(rolemaker.getRolesForPrincipal(user))
-
-            roleList = {}
-            for role in self.portal_roles:
-                canAssign = user.canAssignRole(role)
-                if role == 'Manager' and not self.is_zope_manager:
-                    canAssign = False
-                roleList[role]={'canAssign': canAssign,
-                                'explicit': role in explicitlyAssignedRoles,
-                                'inherited': role in allInheritedRoles[userId]}
-
-            canDelete = user.canDelete()
-            canPasswordSet = user.canPasswordSet()
-            if roleList['Manager']['explicit'] or roleList['Manager']['inherited']:
-                if not self.is_zope_manager:
-                    canDelete = False
-                    canPasswordSet = False
-
-            user_info['roles'] = roleList
-            user_info['fullname'] = user.getProperty('fullname', '')
-            user_info['email'] = user.getProperty('email', '')
-            user_info['can_delete'] = canDelete
-            user_info['can_set_email'] = user.canWriteProperty('email')
-            user_info['can_set_password'] = canPasswordSet
-            results.append(user_info)
+            members[userId] = user
+            user_infos.append(merged[userId])
 
         # Sort the users by fullname
-        results.sort(key=lambda x: x is not None and x['fullname'] is not None and normalizeString(x['fullname']) or '')
-
-        # Reset the request variable, just in case.
-        self.request.set('__ignore_group_roles__', False)
-        return results
+        user_infos.sort(key=lambda x: normalizeString(
+            members[x['userid']].getProperty('fullname', '') or ''))
+        return LazyMap(
+            lambda x: self._userInfo(x, members[x['userid']]), user_infos)
+
+    def _principalRoles(self, user, inherited):
+        """Return the roles the roles plugins grant to user.
+
+        With inherited set only the roles from the groups of the user are
+        asked for, otherwise only the roles assigned to the user itself.
+        The roles are kept on the request.
+        """
+        annotations = IAnnotations(self.request)
+        cache = annotations.setdefault(ROLES_KEY, {})
+        key = (user.getId(), inherited)
+        if key not in cache:
+            acl = getToolByName(self, 'acl_users')
+            rolemakers = acl.plugins.listPlugins(IRolesPlugin)
+            # We push this in the request so that IRoles plugins are told
+            # whether to provide the roles inherited from the groups to
+            # which the principal belongs or the direct ones.
+            self.request.set('__ignore_group_roles__', not inherited)
+            self.request.set('__ignore_direct_roles__', inherited)
+            try:
+                roles = []
+                for rolemaker_id, rolemaker in rolemakers:
+                    roles.extend(rolemaker.getRolesForPrincipal(user))
+            finally:
+                # Reset the request variables, just in case.
+                self.request.set('__ignore_group_roles__', False)
+                self.request.set('__ignore_direct_roles__', False)
+            cache[key] = frozenset(roles)
+        return cache[key]
+
+    def _userInfo(self, user_info, user):
+        """Tack on the roles and capabilities of user, found by a search,
+        including whether each role is explicitly assigned ('explicit'),
+        inherited ('inherited'), or not assigned at all (None).
+        """
+        inheritedRoles = self._principalRoles(user, True)
+        explicitlyAssignedRoles = self._principalRoles(user, False)
+
+        roleList = {}
+        for role in self.portal_roles:
+            canAssign = user.canAssignRole(role)
+            if role == 'Manager' and not self.is_zope_manager:
+                canAssign = False
+            roleList[role] = {'canAssign': canAssign,
+                              'explicit': role in explicitlyAssignedRoles,
+                              'inherited': role in inheritedRoles}
+
+        canDelete = user.canDelete()
+        canPasswordSet = user.canPasswordSet()
+        if roleList['Manager']['explicit'] or roleList['Manager']['inherited']:
+            if not self.is_zope_manager:
+                canDelete = False
+                canPasswordSet = False
+
+        user_info['fullname'] = user.getProperty('fullname', '')
+        user_info['email'] = user.getProperty('email', '')
+        user_info['can_delete'] = canDelete
+        user_info['can_set_email'] = user.canWriteProperty('email')
+        user_info['can_set_password'] = canPasswordSet
+        user_info['roles'] = roleList
+        return user_info
 
     def manageUser(self, users=[], resetpassword=[], delete=[]):
         CheckAuthenticator(self.request)
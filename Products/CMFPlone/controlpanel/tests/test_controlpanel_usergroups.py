@@ -44,3 +44,49 @@ class TypesRegistryIntegrationTest(unittest.TestCase):
 
     def test_many_users_setting(self):
         self.assertTrue(hasattr(self.settings, 'many_users'))
+
+    def test_users_overview_search_is_lazy(self):
+        from Products.CMFPlone.controlpanel.browser.usergroups_usersoverview \
+            import ROLES_KEY
+        from plone.app.testing import setRoles
+        from plone.app.testing import TEST_USER_ID
+        from zope.annotation.interfaces import IAnnotations
+        setRoles(self.portal, TEST_USER_ID, ['Manager'])
+        regtool = getToolByName(self.portal, 'portal_registration')
+        # Sorted by full name, not by login
+        for userid, fullname in [('alpha', 'Zeta'), ('zeta', 'Alpha')]:
+            regtool.addMember(userid, 'secret',
+                              properties={'fullname': fullname,
+                                          'email': userid + '@example.org'})
+        view = getMultiAdapter((self.portal, self.request),
+                               name='usergroup-userprefs')
+        results = view.doSearch('')
+        annotations = IAnnotations(self.request)
+        self.assertFalse(annotations.get(ROLES_KEY))
+        userids = [info['userid'] for info in results._seq]
+        self.assertTrue(userids.index('zeta') < userids.index('alpha'))
+        zeta = results[userids.index('zeta')]
+        self.assertEqual(zeta['fullname'], 'Alpha')
+        self.assertEqual(zeta['email'], 'zeta@example.org')
+        self.assertTrue(zeta['roles']['Member']['explicit'])
+        self.assertFalse(zeta['roles']['Manager']['explicit'])
+        # Only the roles of the accessed user were looked up
+        self.assertEqual(set(annotations[ROLES_KEY]),
+                         set([('zeta', True), ('zeta', False)]))
+        self.assertFalse(self.request.get('__ignore_group_roles__'))
+
+    def test_users_overview_search_by_login_sorts_on_fullname(self):
+        from plone.app.testing import setRoles
+        from plone.app.testing import TEST_USER_ID
+        setRoles(self.portal, TEST_USER_ID, ['Manager'])
+        regtool = getToolByName(self.portal, 'portal_registration')
+        # Only the logins match, the plugins return no full name as title
+        for userid, fullname in [('zeta', 'Beta'), ('zetb', 'Alpha')]:
+            regtool.addMember(userid, 'secret',
+                              properties={'fullname': fullname})
+        view = getMultiAdapter((self.portal, self.request),
+                               name='usergroup-userprefs')
+        results = view.doSearch('zet')
+        self.assertEqual([info['userid'] for info in results],
+                         ['zetb', 'zeta'])
+        self.assertEqual(results[0]['fullname'], 'Alpha')
@@ -2,6 +2,7 @@
 from Acquisition import aq_base
 from Acquisition import aq_parent
 from Acquisition import aq_inner
+from persistent import Persistent
 from Products.BTreeFolder2.BTreeFolder2 import BTreeFolder2Base
 from Products.CMFCore.interfaces import IFolderish
 from Products.CMFCore.interfaces import ISiteRoot
@@ -12,31 +13,34 @@ from zope.component import queryUtility
 from zope.component import queryMultiAdapter
 
 
-def get_default_page(context):
-    """Given a folderish item, find out if it has a default-page using
-    the following lookup rules:
+def _contained_default_page(context, pages):
+    """Return the ids of the folder and the default page found by the
+    lookup rules 1 to 3.1, which only depend on the folder itself.
 
-        1. A content object called 'index_html' wins
-        2. Else check for IBrowserDefault, either if the container implements
-           it or if an adapter exists. In both cases fetch its FTI and either
-           take it if it implements IDynamicViewTypeInformation or adapt it to
-           IDynamicViewTypeInformation. call getDefaultPage on the implementer
-           and take value if given.
-        3. Else, look up the attribute default_page on the object, without
-           acquisition in place
-        3.1 look for a content in the container with the id, no acquisition!
-        3.2 look for a content at portal, with acquisition
-        4. Else, look up the property default_page in site_properties for
-           magic ids and test these
-
-    The id of the first matching item is then used to lookup a translation
-    and if found, its id is returned. If no default page is set, None is
-    returned. If a non-folderish item is passed in, return None always.
+    For folders keeping their items in the ``_objects`` tuple, both are
+    kept in a volatile attribute and reused as long as ``_objects`` and the
+    default_page attribute stay the same.  ``_objects`` is replaced on
+    every add, remove and rename, so its identity tells whether the folder
+    contents changed.
     """
-    # met precondition?
-    if not IFolderish.providedBy(context):
-        return
-
+    base = aq_base(context)
+    objects = getattr(base, '_objects', None)
+    if isinstance(base, BTreeFolder2Base) or \
+            not isinstance(base, Persistent) or \
+            not isinstance(objects, tuple):
+        return _lookup_contained_default_page(context, pages)
+
+    if isinstance(pages, list):
+        pages = tuple(pages)
+    cached = getattr(base, '_v_default_page', None)
+    if cached is not None and cached[0] is objects and cached[1] == pages:
+        return cached[2], cached[3]
+    ids, page = _lookup_contained_default_page(context, pages)
+    base._v_default_page = (objects, pages, ids, page)
+    return ids, page
+
+
+def _lookup_contained_default_page(context, pages):
     # The ids where we look for default - must support __contains__
     ids = set()
 
@@ -48,7 +52,7 @@ def get_default_page(context):
 
     # 1. test for contentish index_html
     if 'index_html' in ids:
-        return 'index_html'
+        return ids, 'index_html'
 
     # 2. Test for IBrowserDefault
     if IBrowserDefault.providedBy(context):
@@ -66,15 +70,47 @@ def get_default_page(context):
             if dynamic_fti is not None:
                 page = dynamic_fti.getDefaultPage(context, check_exists=True)
                 if page is not None:
-                    return page
+                    return ids, page
 
     # 3.1 Test for default_page attribute in folder, no acquisition
+    for page in pages:
+        if page and page in ids:
+            return ids, page
+    return ids, None
+
+
+def get_default_page(context):
+    """Given a folderish item, find out if it has a default-page using
+    the following lookup rules:
+
+        1. A content object called 'index_html' wins
+        2. Else check for IBrowserDefault, either if the container implements
+           it or if an adapter exists. In both cases fetch its FTI and either
+           take it if it implements IDynamicViewTypeInformation or adapt it to
+           IDynamicViewTypeInformation. call getDefaultPage on the implementer
+           and take value if given.
+        3. Else, look up the attribute default_page on the object, without
+           acquisition in place
+        3.1 look for a content in the container with the id, no acquisition!
+        3.2 look for a content at portal, with acquisition
+        4. Else, look up the property default_page in site_properties for
+           magic ids and test these
+
+    The id of the first matching item is then used to lookup a translation
+    and if found, its id is returned. If no default page is set, None is
+    returned. If a non-folderish item is passed in, return None always.
+    """
+    # met precondition?
+    if not IFolderish.providedBy(context):
+        return
+
     pages = getattr(aq_base(context), 'default_page', [])
     if isinstance(pages, basestring):
         pages = [pages]
-    for page in pages:
-        if page and page in ids:
-            return page
+
+    ids, page = _contained_default_page(context, pages)
+    if page is not None:
+        return page
 
     portal = queryUtility(ISiteRoot)
     # Might happen during portal creation
@@ -1,7 +1,10 @@
 from zope.interface import implements
 from zope.component.interfaces import ObjectEvent
 
+from zope.globalrequest import getRequest
 from Products.CMFCore.utils import getToolByName
+from Products.CMFPlone.ActionsTool import invalidateActionInfos
+from Products.CMFPlone.browser.ploneview import invalidateToolbar
 
 from interfaces import ISiteManagerCreatedEvent
 from interfaces import IReorderedEvent
@@ -41,3 +44,15 @@ def removeBase(event):
     https://dev.plone.org/ticket/13705
     """
     event.request.response.base = None
+
+
+def invalidateActionInfosCache(event):
+    """ Changes to content, workflow state or the actions themselves can
+    change which actions are available, so the action infos and toolbar
+    state memoized on the request are dropped.
+    """
+    request = getRequest()
+    if request is None:
+        request = getattr(event.object, 'REQUEST', None)
+    invalidateActionInfos(request)
+    invalidateToolbar(request)
@@ -0,0 +1,171 @@
+"""Deferred catalog indexing.
+
+When the catalog's ``defer_indexing`` property is set, or inside a
+``deferred()`` block, index, reindex and unindex requests for content are
+collected in a queue bound to the current transaction.  Repeated requests
+for the same catalog entry are merged and the result is applied once,
+right before the transaction commits.
+
+Code that needs up to date catalog results in the middle of a transaction
+calls ``processQueue``.  Catalog searches do this automatically.
+"""
+from collections import OrderedDict
+from transaction.interfaces import ISavepointDataManager
+from zope.interface import implementer
+
+import threading
+import transaction
+
+CATALOG = 'catalog'
+UNCATALOG = 'uncatalog'
+
+_local = threading.local()
+
+
+@implementer(ISavepointDataManager)
+class IndexQueue(object):
+    """Catalog operations pending in a transaction, keyed on the catalog
+    and the uid of the entry.
+    """
+
+    def __init__(self, txn):
+        self.transaction = txn
+        self.transaction_manager = transaction.manager
+        self.operations = OrderedDict()
+        self.hooked = False
+
+    def __len__(self):
+        return len(self.operations)
+
+    def _hook(self):
+        if not self.hooked:
+            self.transaction.addBeforeCommitHook(self.beforeCommit)
+            self.hooked = True
+
+    def catalog(self, catalog, obj, uid, idxs, update_metadata):
+        key = (catalog.getPhysicalPath(), uid)
+        pending = self.operations.get(key)
+        idxs = list(idxs or [])
+        if pending is not None and pending[0] == CATALOG:
+            # An empty list means all indexes
+            pending_idxs = pending[4]
+            if pending_idxs and idxs:
+                idxs = pending_idxs + [
+                    i for i in idxs if i not in pending_idxs]
+            else:
+                idxs = []
+            update_metadata = pending[5] or update_metadata
+        elif pending is not None:
+            # After an unindex the uid may be reused by another object, so
+            # it is indexed completely.
+            idxs = []
+            update_metadata = 1
+        self.operations[key] = (
+            CATALOG, catalog, obj, uid, idxs, update_metadata)
+        self._hook()
+
+    def uncatalog(self, catalog, uid):
+        # Unindexing replaces any pending (re)index of the entry
+        self.operations[(catalog.getPhysicalPath(), uid)] = (
+            UNCATALOG, catalog, None, uid, None, None)
+        self._hook()
+
+    def process(self):
+        """Apply and clear the pending operations.
+        """
+        while self.operations:
+            key, operation = self.operations.popitem(last=False)
+            op, catalog, obj, uid, idxs, update_metadata = operation
+            if op == UNCATALOG:
+                catalog._unindexObjectNow(uid)
+            else:
+                catalog._reindexObjectNow(obj, idxs, update_metadata, uid)
+
+    def beforeCommit(self):
+        self.hooked = False
+        self.process()
+
+    # data manager API, only used to support savepoints and aborts
+
+    def savepoint(self):
+        return QueueSavepoint(self)
+
+    def abort(self, txn):
+        self.operations.clear()
+        # Rolling back a savepoint taken before the queue joined unjoins
+        # it, the next request has to join a new queue.
+        if getattr(_local, 'queue', None) is self:
+            _local.queue = None
+
+    def tpc_begin(self, txn):
+        pass
+
+    def commit(self, txn):
+        pass
+
+    def tpc_vote(self, txn):
+        pass
+
+    def tpc_finish(self, txn):
+        self.operations.clear()
+
+    def tpc_abort(self, txn):
+        self.operations.clear()
+
+    def sortKey(self):
+        return 'Products.CMFPlone.indexing.%d' % id(self)
+
+
+class QueueSavepoint(object):
+
+    def __init__(self, queue):
+        self.queue = queue
+        self.operations = queue.operations.copy()
+
+    def rollback(self):
+        self.queue.operations = self.operations.copy()
+
+
+def getQueue():
+    """Return the queue of the current transaction, creating it when
+    needed.
+    """
+    txn = transaction.get()
+    queue = getattr(_local, 'queue', None)
+    if queue is None or queue.transaction is not txn:
+        queue = _local.queue = IndexQueue(txn)
+        txn.join(queue)
+    return queue
+
+
+def processQueue():
+    """Apply pending catalog operations of the current transaction.
+    """
+    queue = getattr(_local, 'queue', None)
+    if queue is not None and queue.operations and \
+            queue.transaction is transaction.get():
+        queue.process()
+
+
+def isDeferred():
+    """True inside a deferred() block.
+    """
+    return getattr(_local, 'deferred', 0) > 0
+
+
+class deferred(object):
+    """Context manager queueing content indexing regardless of the catalog
+    setting.  The queue is processed when the outermost block exits
+    without an error.
+    """
+
+    def __enter__(self):
+        _local.deferred = getattr(_local, 'deferred', 0) + 1
+        # Join now, so savepoints taken in the block cover the queue
+        getQueue()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _local.deferred -= 1
+        if exc_type is None and not _local.deferred:
+            processQueue()
@@ -9,11 +9,15 @@ from Products.CMFPlone.patterns.utils import get_portal_url
 from Products.CMFCore.interfaces._content import IFolderish
 from plone.uuid.interfaces import IUUID
 from Products.CMFPlone.interfaces import IPloneSiteRoot
-from Acquisition import aq_parent, aq_inner
+from Acquisition import aq_base, aq_parent, aq_inner
 from plone.app.theming.utils import theming_policy
 from Products.CMFCore.utils import getToolByName
 from zope.component.hooks import getSite
 
+# Static TinyMCE configurations by registry and portal url
+_static_configs = {}
+STATIC_CONFIG_CACHE_SIZE = 20
+
 
 class TinyMCESettingsGenerator(object):
 
@@ -74,7 +78,38 @@ class TinyMCESettingsGenerator(object):
             'items': [self.get_style_format(t) for t in alignment_styles]
         }]
 
-    def get_tiny_config(self):
+    def _settings_token(self):
+        """The raw values of the TinyMCE records, read straight from the
+        registry storage.
+        """
+        values = getUtility(IRegistry).records._values
+        return tuple([values.get('plone.' + name)
+                      for name in ITinyMCESchema.names(all=True)])
+
+    def get_static_config(self):
+        """Return the part of the configuration that is the same for all
+        users and contexts.
+
+        It is built once for the registry, theme and portal url, and
+        rebuilt when one of the TinyMCE records changes.  The result is
+        shared, callers must copy what they change.
+        """
+        theme = self.get_theme()
+        token = (self._settings_token(),
+                 getattr(theme, 'tinymce_content_css', None),
+                 getattr(theme, 'tinymce_styles_css', None))
+        registry = getUtility(IRegistry)
+        key = (getattr(aq_base(registry), '_p_oid', None) or id(registry),
+               self.portal_url)
+        cached = _static_configs.get(key)
+        if cached is None or cached[0] != token:
+            if len(_static_configs) >= STATIC_CONFIG_CACHE_SIZE:
+                _static_configs.clear()
+            cached = (token, self._build_static_config(theme))
+            _static_configs[key] = cached
+        return cached[1]
+
+    def _build_static_config(self, theme):
         settings = self.settings
 
         tiny_config = {
@@ -88,7 +123,6 @@ class TinyMCESettingsGenerator(object):
             'importcss_file_filter': '%s/++plone++static/tinymce-styles.css' % (
                 self.portal_url)
         }
-        toolbar_additions = settings.custom_buttons or []
 
         if settings.editor_height:
             tiny_config['height'] = settings.editor_height
@@ -102,33 +136,11 @@ class TinyMCESettingsGenerator(object):
         if 'contextmenu' in settings.plugins:
             tiny_config['contextmenu'] = "plonelink ploneimage inserttable | cell row column deletetable"  # noqa
 
-        theme = self.get_theme()
         if theme and getattr(theme, 'tinymce_styles_css', None):
             tiny_config['importcss_file_filter'] += ',%s/%s' % (
                 self.portal_url,
                 theme.tinymce_styles_css.lstrip('/'))
 
-        if settings.libraries_spellchecker_choice == 'AtD':
-            mtool = getToolByName(self.portal, 'portal_membership')
-            member = mtool.getAuthenticatedMember()
-            member_id = member.getId()
-            if member_id:
-                if 'compat3x' not in tiny_config['plugins']:
-                    tiny_config['plugins'].append('compat3x')
-                tiny_config['external_plugins']['AtD'] = \
-                    '%s/++plone++static/tinymce-AtD-plugin/editor_plugin.js' % self.portal_url  # noqa
-                # None when Anonymous User
-                tiny_config['atd_rpc_id'] = 'plone-' + member_id
-                tiny_config['atd_rpc_url'] = self.portal_url
-                tiny_config['atd_show_types'] = ','.join(settings.libraries_atd_show_types)  # noqa
-                tiny_config['atd_ignore_strings'] = ','.join(settings.libraries_atd_ignore_strings)  # noqa
-                toolbar_additions.append('AtD')
-        elif settings.libraries_spellchecker_choice == 'AtD':
-            tiny_config['browser_spellcheck'] = True
-
-        if toolbar_additions:
-            tiny_config['toolbar'] += ' | %s' % ' '.join(toolbar_additions)
-
         for plugin in settings.custom_plugins or []:
             parts = plugin.split('|')
             if len(parts) != 2:
@@ -152,6 +164,42 @@ class TinyMCESettingsGenerator(object):
 
         return tiny_config
 
+    def get_tiny_config(self):
+        settings = self.settings
+        static_config = self.get_static_config()
+
+        # Copy what is changed for the current user
+        tiny_config = dict(static_config)
+        tiny_config['plugins'] = list(static_config['plugins'])
+        tiny_config['external_plugins'] = dict(
+            static_config['external_plugins'])
+        toolbar_additions = list(settings.custom_buttons or [])
+
+        if settings.libraries_spellchecker_choice == 'AtD':
+            mtool = getToolByName(self.portal, 'portal_membership')
+            member = mtool.getAuthenticatedMember()
+            member_id = member.getId()
+            if member_id:
+                if 'compat3x' not in tiny_config['plugins']:
+                    tiny_config['plugins'].append('compat3x')
+                # custom plugins take precedence
+                tiny_config['external_plugins'].setdefault(
+                    'AtD',
+                    '%s/++plone++static/tinymce-AtD-plugin/editor_plugin.js' % self.portal_url)  # noqa
+                # None when Anonymous User
+                tiny_config['atd_rpc_id'] = 'plone-' + member_id
+                tiny_config['atd_rpc_url'] = self.portal_url
+                tiny_config['atd_show_types'] = ','.join(settings.libraries_atd_show_types)  # noqa
+                tiny_config['atd_ignore_strings'] = ','.join(settings.libraries_atd_ignore_strings)  # noqa
+                toolbar_additions.append('AtD')
+        elif settings.libraries_spellchecker_choice == 'AtD':
+            tiny_config['browser_spellcheck'] = True
+
+        if toolbar_additions:
+            tiny_config['toolbar'] += ' | %s' % ' '.join(toolbar_additions)
+
+        return tiny_config
+
 
 class PloneSettingsAdapter(object):
     """
@@ -10,18 +10,116 @@ from plone.registry.interfaces import IRegistry
 from plone.resource.interfaces import IResourceDirectory
 from plone.subrequest import subrequest
 from slimit import minify
+from transaction.interfaces import ISavepointDataManager
 from zope.component import getUtility
 from zope.component.hooks import getSite
 from zope.globalrequest import getRequest
 from zope.interface import alsoProvides
+from zope.interface import implementer
 from zExceptions import NotFound
 
+import hashlib
+import threading
+import transaction
+
 logger = logging.getLogger('Products.CMFPlone')
 
+# Bundles being cooked, or cooked in a transaction that is not finished
+# yet, by site and bundle record prefix
+_cooking = set()
+_cooking_lock = threading.Lock()
+
+# Minified javascript by md5 of the source
+_minified = {}
+MINIFIED_CACHE_SIZE = 200
+
+
+def minify_js(js):
+    """Minify javascript, reusing the result for sources seen before.
+    A SyntaxError is raised for invalid sources.
+    """
+    key = hashlib.md5(js).hexdigest()
+    cooked = _minified.get(key)
+    if cooked is None:
+        cooked = minify(js, mangle=False, mangle_toplevel=False)
+        if len(_minified) >= MINIFIED_CACHE_SIZE:
+            _minified.clear()
+        _minified[key] = cooked
+    return cooked
+
+
+def _writeFile(folder, path, data):
+    """Write a file in a resource directory, unless it has the same data
+    already.
+    """
+    if folder.isFile(path) and folder.readFile(path) == data:
+        return
+    folder.writeFile(path, StringIO(data))
+
+
+def _release(key):
+    with _cooking_lock:
+        _cooking.discard(key)
+
+
+@implementer(ISavepointDataManager)
+class CookingGuard(object):
+    """Keeps a bundle marked as being cooked until the transaction that
+    cooked it is finished, so threads of this process do not cook it again
+    before the compiled bundle is committed.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.transaction_manager = transaction.manager
+
+    def release(self, txn):
+        _release(self.key)
+
+    abort = tpc_finish = tpc_abort = release
+
+    def tpc_begin(self, txn):
+        pass
+
+    commit = tpc_vote = tpc_begin
+
+    def savepoint(self):
+        return CookingGuardSavepoint()
+
+    def sortKey(self):
+        return 'Products.CMFPlone.resources.browser.cook.%d' % id(self)
+
+
+class CookingGuardSavepoint(object):
+
+    def rollback(self):
+        pass
+
 
 def cookWhenChangingSettings(context, bundle):
     """When our settings are changed, re-cook the not compilable bundles
+
+    Only one thread of the process cooks a bundle at a time.  Other
+    requests noticing the stale bundle meanwhile return at once and keep
+    using the previously compiled files.  Other ZEO clients are not
+    guarded; concurrent cooks there end in a conflict error and a retry.
     """
+    key = ('/'.join(getSite().getPhysicalPath()),
+           getattr(bundle, '__prefix__', None) or id(bundle))
+    with _cooking_lock:
+        if key in _cooking:
+            logger.info('Bundle %s is already being cooked', key[1])
+            return
+        _cooking.add(key)
+    try:
+        _cook(context, bundle)
+    except:
+        _release(key)
+        raise
+    transaction.get().join(CookingGuard(key))
+
+
+def _cook(context, bundle):
     registry = getUtility(IRegistry)
     resources = registry.collectionOfInterface(
         IResourceRegistry, prefix="plone.resources", check=False)
@@ -47,7 +145,7 @@ def cookWhenChangingSettings(context, bundle):
                     try:
                         cooked_js += '\n/* resource: %s */\n%s' % (
                             resource.js,
-                            minify(js, mangle=False, mangle_toplevel=False)
+                            minify_js(js)
                         )
                     except SyntaxError:
                         cooked_js += '\n/* resource(error cooking): %s */\n%s' % (
@@ -71,8 +169,7 @@ def cookWhenChangingSettings(context, bundle):
         container.makeDirectory(resource_name)
     try:
         folder = container[resource_name]
-        fi = StringIO(cooked_js)
-        folder.writeFile(resource_filepath, fi)
+        _writeFile(folder, resource_filepath, cooked_js)
 
         if css_path:
             # Storing css if defined
@@ -85,8 +182,7 @@ def cookWhenChangingSettings(context, bundle):
             if resource_name not in container:
                 container.makeDirectory(resource_name)
             folder = container[resource_name]
-            fi = StringIO(cooked_css)
-            folder.writeFile(resource_filepath, fi)
+            _writeFile(folder, resource_filepath, cooked_css)
         bundle.last_compilation = datetime.now()
         # setRequest(original_request)
     except NotFound:
@@ -1,4 +1,5 @@
 from Acquisition import aq_inner, aq_base, aq_parent
+from collections import OrderedDict
 from Products.CMFCore.Expression import Expression
 from Products.CMFCore.Expression import createExprContext
 from Products.CMFCore.utils import getToolByName
@@ -7,13 +8,114 @@ from Products.CMFPlone.interfaces import IResourceRegistry
 from plone.app.layout.viewlets.common import ViewletBase
 from plone.app.theming.utils import theming_policy
 from plone.registry.interfaces import IRegistry
-from zope import component
 from zope.component import getMultiAdapter
 from zope.component import getUtility
-from zope.ramcache.interfaces import ram
+from zope.schema import getFieldNames
 from Products.CMFCore.utils import _getAuthenticatedUser
 from plone.memoize.view import memoize
 from Products.CMFPlone.resources import RESOURCE_DEVELOPMENT_MODE
+from Products.CMFPlone.resources.browser.cook import cookWhenChangingSettings
+
+BUNDLES_PREFIX = 'plone.bundles'
+BUNDLE_FIELDS = getFieldNames(IBundleRegistry)
+
+_manifests = {}
+
+
+class BundleSnapshot(object):
+    """Copy of the registry settings of a bundle, with its expression
+    compiled.  It is shared between threads and must not be changed.
+    """
+
+    def __init__(self, proxy):
+        for name in BUNDLE_FIELDS:
+            setattr(self, name, getattr(proxy, name))
+        self.__prefix__ = proxy.__prefix__
+        self.cooked_expression = None
+        if self.expression:
+            self.cooked_expression = Expression(self.expression)
+
+
+def order_bundles(bundles):
+    """Order (key, bundle) pairs so each bundle comes after the bundle it
+    depends on.  Bundles whose dependency is missing come last.
+    """
+    result = []
+    inserted = set()
+    depends_on = OrderedDict()
+    for key, bundle in bundles:
+        if bundle.depends is None or bundle.depends == '':
+            # its the first one
+            result.append((key, bundle))
+            inserted.add(key)
+        else:
+            depends_on.setdefault(bundle.depends.strip(), []).append(
+                (key, bundle))
+
+    # We need to check all dependencies
+    while depends_on:
+        found = False
+        for name, bundles_to_add in depends_on.items():
+            if name in inserted:
+                found = True
+                result.extend(bundles_to_add)
+                inserted.update(key for key, bundle in bundles_to_add)
+                del depends_on[name]
+        if not found:
+            break
+
+    # The ones that do not get their dependencies
+    for bundles_to_add in depends_on.values():
+        result.extend(bundles_to_add)
+    return result
+
+
+class BundleManifest(object):
+    """The bundles of the registry as snapshots, plus their dependency
+    order for each set of bundles that was rendered.
+    """
+
+    def __init__(self, token, bundles):
+        self.token = token
+        self.bundles = bundles
+        self._orders = {}
+
+    def ordered(self, bundles):
+        keys = tuple(key for key, bundle in bundles)
+        order = self._orders.get(keys)
+        if order is None:
+            if len(self._orders) >= 100:
+                self._orders.clear()
+            order = self._orders[keys] = order_bundles(bundles)
+        return order
+
+
+def _bundles_token(registry):
+    """The raw values of all bundle records.  They are read from the
+    registry storage in a single range query, so comparing them is much
+    cheaper than building the bundle proxies.
+    """
+    values = registry.records._values
+    return tuple(values.items(
+        min=BUNDLES_PREFIX + '/', max=BUNDLES_PREFIX + '0'))
+
+
+def get_bundle_manifest(registry):
+    """Return the bundle manifest for the registry, rebuilt whenever a
+    bundle record changed.
+    """
+    token = _bundles_token(registry)
+    key = getattr(aq_base(registry), '_p_oid', None) or id(registry)
+    manifest = _manifests.get(key)
+    if manifest is None or manifest.token != token:
+        bundles = registry.collectionOfInterface(
+            IBundleRegistry, prefix=BUNDLES_PREFIX, check=False)
+        manifest = BundleManifest(
+            token,
+            [(name, BundleSnapshot(proxy))
+             for name, proxy in bundles.items()])
+        _manifests[key] = manifest
+    return manifest
 
 
 class ResourceView(ViewletBase):
@@ -42,6 +144,7 @@ class ResourceView(ViewletBase):
         return self.development and getattr(bundle, attr, False)
 
     @property
+    @memoize
     def last_legacy_import(self):
         return self.registry.records['plone.resources.last_legacy_import'].value  # noqa
 
@@ -87,16 +190,24 @@ class ResourceView(ViewletBase):
         return self.registry.collectionOfInterface(
             IBundleRegistry, prefix="plone.bundles", check=False)
 
+    @memoize
     def get_resources(self):
         return self.registry.collectionOfInterface(
             IResourceRegistry, prefix="plone.resources", check=False)
 
+    def cook_bundle(self, bundle):
+        """Cook a legacy bundle and return its current registry settings.
+        """
+        name = bundle.__prefix__.split('/', 1)[1].rstrip('.')
+        bundle = self.get_bundles()[name]
+        cookWhenChangingSettings(self.context, bundle)
+        return bundle
+
     def get_cooked_bundles(self):
         """
         Get the cooked bundles
         """
-        cache = component.queryUtility(ram.IRAMCache)
-        bundles = self.get_bundles()
+        bundles = get_bundle_manifest(self.registry).bundles
         policy = theming_policy(self.request)
         # Check if its Diazo enabled
         if policy.isThemeEnabled():
@@ -130,7 +241,7 @@ class ResourceView(ViewletBase):
         if hasattr(self.request, 'disabled_bundles'):
             disabled_request_bundles.extend(self.request.disabled_bundles)
 
-        for key, bundle in bundles.items():
+        for key, bundle in bundles:
             # The diazo manifest and request bundles are more important than
             # the disabled bundle on registry.
             # We can access the site with diazo.off=1 without diazo bundles
@@ -140,23 +251,9 @@ class ResourceView(ViewletBase):
                     (key not in disabled_diazo_bundles
                         and key not in disabled_request_bundles):
                 # check expression
-                if bundle.expression:
-                    cooked_expression = None
-                    if cache is not None:
-                        cooked_expression = cache.query(
-                            'plone.bundles.cooked_expressions',
-                            key=dict(prefix=bundle.__prefix__), default=None)
-                    if (
-                            cooked_expression is None or
-                            cooked_expression.text != bundle.expression):
-                        cooked_expression = Expression(bundle.expression)
-                        if cache is not None:
-                            cache.set(
-                                cooked_expression,
-                                'plone.bundles.cooked_expressions',
-                                key=dict(prefix=bundle.__prefix__))
+                if bundle.cooked_expression is not None:
                     if not self.evaluateExpression(
-                            cooked_expression, self.context):
+                            bundle.cooked_expression, self.context):
                         continue
                 yield key, bundle
 
@@ -165,38 +262,8 @@ class ResourceView(ViewletBase):
         It gets the ordered result of bundles
         """
         result = []
-        # The first one
-        inserted = []
-        depends_on = {}
-        for key, bundle in self.get_cooked_bundles():
-            if bundle.depends is None or bundle.depends == '':
-                # its the first one
-                self.get_data(bundle, result)
-                inserted.append(key)
-            else:
-                name = bundle.depends.strip()
-                if name in depends_on:
-                    depends_on[name].append(bundle)
-                else:
-                    depends_on[name] = [bundle]
-
-        # We need to check all dependencies
-        while len(depends_on) > 0:
-            found = False
-            for key, bundles_to_add in depends_on.items():
-                if key in inserted:
-                    found = True
-                    for bundle in bundles_to_add:
-                        self.get_data(bundle, result)
-                        inserted.append(
-                            bundle.__prefix__.split('/', 1)[1].rstrip('.'))
-                    del depends_on[key]
-            if not found:
-                break
-
-        # THe ones that does not get the dependencies
-        for bundles_to_add in depends_on.values():
-            for bundle in bundles_to_add:
-                self.get_data(bundle, result)
-
+        manifest = get_bundle_manifest(self.registry)
+        bundles = list(self.get_cooked_bundles())
+        for key, bundle in manifest.ordered(bundles):
+            self.get_data(bundle, result)
         return result
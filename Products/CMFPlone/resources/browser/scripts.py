@@ -1,6 +1,5 @@
 from Products.CMFPlone.resources.browser.resource import ResourceView
 from urlparse import urlparse
-from Products.CMFPlone.resources.browser.cook import cookWhenChangingSettings
 
 
 class ScriptsView(ResourceView):
@@ -35,7 +34,7 @@ class ScriptsView(ResourceView):
                         and bundle.resources):
                     # We need to combine files. It's possible no resources are defined
                     # because the compiling is done outside of plone
-                    cookWhenChangingSettings(self.context, bundle)
+                    bundle = self.cook_bundle(bundle)
             if bundle.jscompilation:
                 result.append({
                     'bundle': bundle_name,
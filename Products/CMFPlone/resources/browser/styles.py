@@ -1,4 +1,3 @@
-from Products.CMFPlone.resources.browser.cook import cookWhenChangingSettings
 from Products.CMFPlone.resources.browser.resource import ResourceView
 from urlparse import urlparse
 
@@ -56,7 +55,7 @@ class StylesView(ResourceView):
                 if not bundle.last_compilation\
                         or self.last_legacy_import > bundle.last_compilation:
                     # We need to compile
-                    cookWhenChangingSettings(self.context, bundle)
+                    bundle = self.cook_bundle(bundle)
 
             if bundle.csscompilation:
                 result.append({
@@ -46,7 +46,9 @@ contents = context.portal_catalog.queryCatalog(contentFilter, show_all=1,
     show_inactive=show_inactive, )
 
 if full_objects:
-    contents = [b.getObject() for b in contents]
+    # Objects are only loaded for the items used, e.g. the current page
+    from Products.CMFPlone.utils import lazyObjects
+    contents = lazyObjects(contents)
 
 if batch:
     from Products.CMFPlone import Batch
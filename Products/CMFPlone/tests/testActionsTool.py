@@ -1,7 +1,9 @@
 from plone.app.testing.bbb import PloneTestCase
 
 from traceback import format_exception
+from zope.event import notify
 from zope.i18nmessageid.message import Message
+from zope.lifecycleevent import ObjectModifiedEvent
 
 from Acquisition import Explicit
 from OFS.SimpleItem import Item
@@ -121,3 +123,50 @@ class TestActionsTool(PloneTestCase):
         except:
             self.fail_tb('Should not fail if item exists w/o IActionCategory '
                          'interface')
+
+    def testListActionInfosActionChain(self):
+        infos = self.actions.listActionInfos(
+            action_chain=('site_actions/accessibility', 'site_actions/sitemap',
+                          'site_actions/missing'),
+            object=self.folder)
+        self.assertEqual([ai['id'] for ai in infos],
+                         ['accessibility', 'sitemap'])
+
+    def testListActionInfosSkipsInvisible(self):
+        self.actions.site_actions.sitemap.visible = False
+        infos = self.actions.listActionInfos(
+            object=self.folder, categories=('site_actions', ))
+        self.assertFalse('sitemap' in [ai['id'] for ai in infos])
+        infos = self.actions.listActionInfos(
+            object=self.folder, categories=('site_actions', ),
+            check_visibility=0)
+        self.assertTrue('sitemap' in [ai['id'] for ai in infos])
+
+    def listSiteActionTitles(self):
+        return [ai['title'] for ai in self.actions.listActionInfos(
+                object=self.folder, categories=('site_actions', ))]
+
+    def testListActionInfosMemoized(self):
+        before = self.listSiteActionTitles()
+        # Changed without an event, so the memoized infos are returned
+        self.actions.site_actions.sitemap.title = 'Changed'
+        self.assertEqual(self.listSiteActionTitles(), before)
+        # Changes drop the memoized infos
+        notify(ObjectModifiedEvent(self.folder))
+        self.assertTrue('Changed' in self.listSiteActionTitles())
+
+    def testListActionInfosMemoizedPerUser(self):
+        before = self.listSiteActionTitles()
+        self.actions.site_actions.sitemap.title = 'Changed'
+        # A different user gets its own list
+        self.login('user1')
+        self.assertNotEqual(self.listSiteActionTitles(), before)
+
+    def testListActionInfosMemoizedCopies(self):
+        infos = self.actions.listActionInfos(
+            object=self.folder, categories=('site_actions', ))
+        url = infos[0]['url']
+        infos[0]['url'] = 'changed'
+        again = self.actions.listActionInfos(
+            object=self.folder, categories=('site_actions', ))
+        self.assertEqual(again[0]['url'], url)
@@ -78,6 +78,10 @@ class TestCatalogSetup(PloneTestCase):
         # is_folderish should be in catalog schema
         self.assertTrue('is_folderish' in self.catalog.schema())
 
+    def testPretty_titleInSchema(self):
+        # pretty_title should be in catalog schema
+        self.assertTrue('pretty_title' in self.catalog.schema())
+
     def testIs_folderishIsBooleanIndex(self):
         # is_folderish should be a BooleanIndex
         self.assertTrue(
@@ -258,6 +262,49 @@ class TestCatalogIndexing(PloneTestCase):
         self.assertEqual(brain.Title, 'Foo')
         self.assertEqual(brain.Description, 'Bar')
 
+    def testReindexIndexes(self):
+        self.catalog.indexObject(self.folder.doc)
+        self.folder.doc.setTitle('Fred')
+        self.folder.doc.setDescription('BamBam')
+        self.assertTrue(
+            self.catalog.reindexIndexes(self.folder.doc, ['Title']))
+        self.assertEqual(len(self.catalog(Title='Fred')), 1)
+        # Description index did not change
+        self.assertEqual(len(self.catalog(Description='Bar')), 1)
+        brain = self.catalog(getId='doc')[0]
+        self.assertEqual(brain.Title, 'Fred')
+        self.assertEqual(brain.Description, 'BamBam')
+
+    def testReindexIndexesSkipsMetadata(self):
+        self.catalog.indexObject(self.folder.doc)
+        self.folder.doc.setTitle('Fred')
+        self.assertTrue(
+            self.catalog.reindexIndexes(self.folder.doc, ['Title'],
+                                        update_metadata=0))
+        self.assertEqual(len(self.catalog(Title='Fred')), 1)
+        brain = self.catalog(getId='doc')[0]
+        self.assertEqual(brain.Title, 'Foo')
+
+    def testReindexIndexesUnchanged(self):
+        self.catalog.indexObject(self.folder.doc)
+        counter = self.catalog.getCounter()
+        self.assertFalse(
+            self.catalog.reindexIndexes(self.folder.doc,
+                                        ['Title', 'review_state']))
+        self.assertEqual(self.catalog.getCounter(), counter)
+
+    def testReindexObjectUsesReindexIndexes(self):
+        self.catalog.indexObject(self.folder.doc)
+        counter = self.catalog.getCounter()
+        self.catalog.reindexObject(self.folder.doc, idxs=['Title'])
+        self.assertEqual(self.catalog.getCounter(), counter)
+
+    def testReindexIndexesNotCataloged(self):
+        self.assertTrue(
+            self.catalog.reindexIndexes(self.folder.doc, ['Title']))
+        self.assertEqual(len(self.catalog(getId='doc')), 1)
+        self.assertEqual(len(self.catalog(Description='Bar')), 1)
+
     def testIndexTitleOnly(self):
         # Indexing should only index the Title
         #
@@ -330,6 +377,83 @@ class TestCatalogIndexing(PloneTestCase):
         self.assertEqual(self.folder.doc.modified(), DateTime(0))
         self.assertEqual(len(self.catalog(modified=DateTime(0))), 1)
 
+    def testClearFindAndRebuildReturnsCount(self):
+        count = self.catalog.clearFindAndRebuild()
+        self.assertEqual(count, len(self.catalog.searchResults()))
+
+    def testClearFindAndRebuildResume(self):
+        # Pretend an earlier rebuild was interrupted after the user folder
+        self.catalog.indexObject(self.folder.doc)
+        self.catalog._rebuild_checkpoint = self.folder.getPhysicalPath()
+        self.catalog.unindexObject(self.portal.Members)
+        self.catalog.unindexObject(self.folder.doc)
+        self.catalog.clearFindAndRebuild(resume=True)
+        # Objects up to the checkpoint are not visited again
+        altered_content = base_content[:]
+        altered_content.remove('Members')
+        res = self.catalog.searchResults()
+        self.assertResults(res, altered_content)
+        self.assertEqual(self.catalog.getRebuildCheckpoint(), None)
+
+
+class TestDeferredIndexing(PloneTestCase):
+
+    def afterSetUp(self):
+        self.catalog = self.portal.portal_catalog
+        self.catalog.defer_indexing = True
+        self.folder.invokeFactory('Document', id='doc', title='Foo')
+        self.path = '/'.join(self.folder.doc.getPhysicalPath())
+
+    def beforeTearDown(self):
+        self.catalog.processQueue()
+        self.catalog.defer_indexing = False
+
+    def isCataloged(self):
+        return self.catalog._catalog.uids.get(self.path) is not None
+
+    def testIndexingIsQueued(self):
+        self.assertFalse(self.isCataloged())
+        self.catalog.processQueue()
+        self.assertTrue(self.isCataloged())
+
+    def testSearchProcessesQueue(self):
+        self.assertEqual(len(self.catalog(Title='Foo')), 1)
+
+    def testReindexesAreMerged(self):
+        self.catalog.processQueue()
+        counter = self.catalog.getCounter()
+        self.folder.doc.setTitle('Fred')
+        self.folder.doc.reindexObject(idxs=['Title'])
+        self.folder.doc.setDescription('BamBam')
+        self.folder.doc.reindexObject(idxs=['Description'])
+        self.catalog.processQueue()
+        self.assertEqual(self.catalog.getCounter(), counter + 1)
+        self.assertEqual(len(self.catalog(Title='Fred')), 1)
+        self.assertEqual(len(self.catalog(Description='BamBam')), 1)
+
+    def testReindexIndexesIsQueued(self):
+        self.catalog.processQueue()
+        self.folder.doc.setTitle('Fred')
+        self.assertEqual(
+            self.catalog.reindexIndexes(self.folder.doc, ['Title']), None)
+        self.assertEqual(len(self.catalog._catalog.searchResults(
+            Title='Fred')), 0)
+        self.assertEqual(len(self.catalog(Title='Fred')), 1)
+
+    def testUnindexDropsReindex(self):
+        self.folder.doc.reindexObject()
+        self.folder.doc.unindexObject()
+        self.catalog.processQueue()
+        self.assertFalse(self.isCataloged())
+
+    def testSavepointRollback(self):
+        self.catalog.processQueue()
+        savepoint = transaction.savepoint()
+        self.folder.doc.unindexObject()
+        savepoint.rollback()
+        self.catalog.processQueue()
+        self.assertTrue(self.isCataloged())
+
 
 class TestCatalogSearching(PloneTestCase):
 
@@ -371,6 +495,29 @@ class TestCatalogSearching(PloneTestCase):
         self.assertTrue(
             user in self.catalog._listAllowedRolesAndUsers(uf.getUser(user2)))
 
+    def testCachedAllowedRolesAndUsers(self):
+        # The terms are computed once per request and user
+        uf = self.portal.acl_users
+        user = uf.getUser(TEST_USER_NAME)
+        first = self.catalog._cachedAllowedRolesAndUsers(user)
+        self.assertEqual(first, self.catalog._listAllowedRolesAndUsers(user))
+        first.append('mutated')
+        self.assertFalse(
+            'mutated' in self.catalog._cachedAllowedRolesAndUsers(user))
+        # Another user object gets its own terms
+        groupname = self.addUser2ToGroup()
+        other = self.catalog._cachedAllowedRolesAndUsers(uf.getUser(user2))
+        self.assertTrue('user:{0:s}'.format(groupname) in other)
+
+    def testEffectiveRangeGranularity(self):
+        self.assertTrue(
+            self.catalog._getEffectiveRangeDate() is not
+            self.catalog._getEffectiveRangeDate())
+        self.catalog.effective_range_granularity = 60
+        date = self.catalog._getEffectiveRangeDate()
+        self.assertEqual(date.timeTime() % 60, 0)
+        self.assertTrue(date is self.catalog._getEffectiveRangeDate())
+
     def testSearchReturnsDocument(self):
         # Document should be found when owner does a search
         self.assertEqual(self.catalog(SearchableText='aaa')[0].id, 'aaa')
@@ -1133,3 +1280,31 @@ class TestObjectProvidedIndexExtender(unittest.TestCase):
             self._index(Dummy()),
             ('Products.CMFPlone.tests.testCatalogTool.IDummy', )
         )
+
+    def testDirectlyProvidedInterface(self):
+        class IDummy(zope.interface.Interface):
+            pass
+
+        class Dummy(object):
+            pass
+        plain = Dummy()
+        marked = Dummy()
+        alsoProvides(marked, IDummy)
+        self.assertEqual(self._index(plain), ())
+        self.assertEqual(
+            self._index(marked),
+            ('Products.CMFPlone.tests.testCatalogTool.IDummy', )
+        )
+
+    def testInterfaceDeclaredLater(self):
+        class IDummy(zope.interface.Interface):
+            pass
+
+        class Dummy(object):
+            pass
+        self.assertEqual(self._index(Dummy()), ())
+        zope.interface.classImplements(Dummy, IDummy)
+        self.assertEqual(
+            self._index(Dummy()),
+            ('Products.CMFPlone.tests.testCatalogTool.IDummy', )
+        )
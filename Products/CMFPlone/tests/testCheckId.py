@@ -236,3 +236,35 @@ class TestCheckId(PloneTestCase):
         self.assertTrue('Owner' in proxy_roles)
         self.assertTrue('Authenticated' in proxy_roles)
         self.assertTrue('Anonymous' in proxy_roles)
+
+
+class TestCheckIds(PloneTestCase):
+
+    def testCheckIds(self):
+        from Products.CMFPlone.checkid import check_ids
+        self.folder.invokeFactory('Document', id='foo')
+        errors = check_ids(self.folder,
+                           ['foo', 'bar', 'created', 'login', '='])
+        self.assertEqual(sorted(errors.keys()),
+                         ['=', 'created', 'foo', 'login'])
+        self.assertEqual(errors['foo'], u'There is already an item named '
+                                        u'foo in this folder.')
+        self.assertEqual(errors['login'], u'login is reserved.')
+
+    def testReservedCatalogNamesFollowSchema(self):
+        from Products.CMFPlone.checkid import reservedCatalogNames
+        portal_catalog = getToolByName(self.portal, 'portal_catalog')
+        self.assertTrue('created' in reservedCatalogNames(portal_catalog))
+        self.assertFalse('new_metadata' in
+                         reservedCatalogNames(portal_catalog))
+        portal_catalog.addColumn('new_metadata')
+        self.assertTrue('new_metadata' in
+                        reservedCatalogNames(portal_catalog))
+        portal_catalog.addIndex('new_index', 'FieldIndex')
+        self.assertTrue('new_index' in reservedCatalogNames(portal_catalog))
+        # Replacing an index keeps the number of indexes
+        portal_catalog.delIndex('new_index')
+        portal_catalog.addIndex('other_index', 'FieldIndex')
+        reserved = reservedCatalogNames(portal_catalog)
+        self.assertFalse('new_index' in reserved)
+        self.assertTrue('other_index' in reserved)
@@ -399,6 +399,52 @@ class TestSiteMap(PloneTestCase.PloneTestCase):
         tree = view.siteMap()
         self.assertTrue(tree)
 
+    def testSitemapTreeSnapshot(self):
+        from plone.app.layout.navigation.navtree import buildFolderTree
+        from Products.CMFPlone.browser.navtree import SitemapQueryBuilder
+        from Products.CMFPlone.browser.navtree import SitemapNavtreeStrategy
+        from Products.CMFPlone.browser.navtree import _buildFolderTreeSnapshot
+        from Products.CMFPlone.browser.navtree import _restore
+        from Acquisition import aq_parent
+        strategy = SitemapNavtreeStrategy(self.portal)
+        query = SitemapQueryBuilder(self.portal)()
+        expected = buildFolderTree(self.portal, obj=self.portal,
+                                   query=query.copy(), strategy=strategy)
+        snapshot = _buildFolderTreeSnapshot(self.portal, self.portal,
+                                            query.copy(), strategy)
+        # The snapshot keeps no acquisition context
+        self.assertTrue(aq_parent(snapshot['children'][0]['item']) is None)
+        tree = _restore(snapshot, self.portal.portal_catalog, strategy)
+
+        def paths(node):
+            return [(child['path'], child['absolute_url'], paths(child))
+                    for child in node['children']]
+        self.assertEqual(paths(tree), paths(expected))
+
+    def testSitemapTreeSnapshotPerLanguage(self):
+        from Products.CMFPlone.browser.navtree import SitemapQueryBuilder
+        from Products.CMFPlone.browser.navtree import SitemapNavtreeStrategy
+        from Products.CMFPlone.browser.navtree import _buildFolderTreeSnapshot
+        catalog = self.portal.portal_catalog
+        # Pretend the catalog state is committed, so trees are cached
+        catalog.getCommittedCounter = lambda: 'language test'
+        strategy = SitemapNavtreeStrategy(self.portal)
+        query = SitemapQueryBuilder(self.portal)()
+        request = self.portal.REQUEST
+        try:
+            request.set('LANGUAGE', 'en')
+            english = _buildFolderTreeSnapshot(self.portal, self.portal,
+                                               query.copy(), strategy)
+            self.assertTrue(_buildFolderTreeSnapshot(
+                self.portal, self.portal, query.copy(), strategy) is english)
+            request.set('LANGUAGE', 'de')
+            german = _buildFolderTreeSnapshot(self.portal, self.portal,
+                                              query.copy(), strategy)
+            self.assertFalse(german is english)
+        finally:
+            del catalog.getCommittedCounter
+            request.set('LANGUAGE', '')
+
     def testComplexSitemap(self):
         # create and test a reasonabley complex sitemap
         path = lambda x: '/'.join(x.getPhysicalPath())
@@ -527,6 +573,16 @@ class TestBasePortalTabs(PloneTestCase.PloneTestCase):
         tabs = view.topLevelTabs(actions=[])
         self.assertEqual(len(tabs), 5)
 
+    def testTabsCacheStatistics(self):
+        from Products.CMFPlone.browser.navigation import tabsCacheStatistics
+        view = self.view_class(self.portal, self.request)
+        before = tabsCacheStatistics()
+        view.topLevelTabs(actions=[])
+        after = tabsCacheStatistics()
+        # Uncommitted catalog changes are never served from the cache
+        self.assertEqual(after['misses'], before['misses'] + 1)
+        self.assertEqual(after['hits'], before['hits'])
+
     def testTabsRespectFolderOrder(self):
         # See if reordering causes a change in the tab order
         view = self.view_class(self.portal, self.request)
@@ -25,4 +25,25 @@ class TestTinyMCESettings(PloneTestCase.PloneTestCase):
 
     def test_style_formats(self):
         conf = self.get_conf()
-        self.assertEqual(len(conf['tiny']['style_formats']), 4)
\ No newline at end of file
+        self.assertEqual(len(conf['tiny']['style_formats']), 4)
+
+    def test_static_config_follows_registry(self):
+        from Products.CMFPlone.patterns import TinyMCESettingsGenerator
+        generator = TinyMCESettingsGenerator(self.portal,
+                                             self.layer['request'])
+        static = generator.get_static_config()
+        self.assertTrue(generator.get_static_config() is static)
+        registry = getUtility(IRegistry)
+        settings = registry.forInterface(ITinyMCESchema, prefix="plone")
+        settings.editor_height = u'123'
+        generator = TinyMCESettingsGenerator(self.portal,
+                                             self.layer['request'])
+        self.assertEqual(generator.get_static_config()['height'], u'123')
+
+    def test_custom_buttons_not_shared(self):
+        registry = getUtility(IRegistry)
+        settings = registry.forInterface(ITinyMCESchema, prefix="plone")
+        settings.custom_buttons = [u'mybutton']
+        toolbar = self.get_conf()['tiny']['toolbar']
+        self.assertTrue(toolbar.endswith(' | mybutton'))
+        self.assertEqual(self.get_conf()['tiny']['toolbar'], toolbar)
@@ -533,6 +533,115 @@ class TestEditMetadataIndependence(PloneTestCase.PloneTestCase):
         self.assertEqual(self.doc.Rights(), 'Copyleft')
 
 
+class TestObjectsByPaths(PloneTestCase.PloneTestCase):
+
+    def afterSetUp(self):
+        self.utils = self.portal.plone_utils
+        self.catalog = self.portal.portal_catalog
+        self.folder.invokeFactory('Document', id='doc1')
+        self.folder.invokeFactory('Document', id='doc2')
+        self.folder.invokeFactory('Folder', id='sub')
+        self.folder.sub.invokeFactory('Document', id='doc3')
+        self.base = '/'.join(self.folder.getPhysicalPath())
+
+    def testDeleteObjectsByPaths(self):
+        paths = [self.base + '/doc1', self.base + '/sub/doc3',
+                 self.base + '/doc2', self.base + '/missing']
+        success, failure = self.utils.deleteObjectsByPaths(paths)
+        self.assertEqual(len(success), 3)
+        self.assertEqual(failure.keys(), [self.base + '/missing'])
+        self.assertEqual(self.folder.objectIds(), ['sub'])
+        self.assertEqual(self.folder.sub.objectIds(), [])
+        self.assertEqual(len(self.catalog(getId='doc1')), 0)
+
+    def testDeleteObjectsByPathsDuplicate(self):
+        paths = [self.base + '/doc1', self.base + '/doc1']
+        success, failure = self.utils.deleteObjectsByPaths(paths)
+        self.assertEqual(len(success), 1)
+        self.assertEqual(failure.keys(), [self.base + '/doc1'])
+        self.assertFalse('doc1' in self.folder)
+
+    def testDeleteObjectsByPathsNested(self):
+        # the item of a deleted folder can no longer be found
+        paths = [self.base + '/sub', self.base + '/sub/doc3']
+        success, failure = self.utils.deleteObjectsByPaths(paths)
+        self.assertEqual(len(success), 1)
+        self.assertEqual(failure.keys(), [self.base + '/sub/doc3'])
+        self.assertFalse('sub' in self.folder)
+
+    def testDeleteObjectsByPathsFailureKeepsCatalog(self):
+        # The whole batch fails, then doc2 fails on its own after it was
+        # queued for unindexing.
+        from zope.lifecycleevent.interfaces import IObjectRemovedEvent
+
+        def fail(obj, event):
+            if obj.getId() == 'doc2':
+                raise ValueError('doc2')
+        gsm = getGlobalSiteManager()
+        gsm.registerHandler(fail, (Interface, IObjectRemovedEvent))
+        try:
+            success, failure = self.utils.deleteObjectsByPaths(
+                [self.base + '/doc1', self.base + '/doc2'])
+        finally:
+            gsm.unregisterHandler(fail, (Interface, IObjectRemovedEvent))
+        self.assertEqual(failure.keys(), [self.base + '/doc2'])
+        self.assertFalse('doc1' in self.folder)
+        self.assertTrue('doc2' in self.folder)
+        self.assertEqual(len(self.catalog(getId='doc1')), 0)
+        self.assertEqual(len(self.catalog(getId='doc2')), 1)
+
+    def testRenameObjectsByPaths(self):
+        paths = [self.base + '/doc1', self.base + '/doc2']
+        success, failure = self.utils.renameObjectsByPaths(
+            paths, ['new1', 'new2'], ['Title 1', ''])
+        self.assertEqual(failure, {})
+        self.assertEqual(sorted(success.keys()), paths)
+        self.assertEqual(self.folder.new1.Title(), 'Title 1')
+        self.assertTrue('new2' in self.folder)
+        self.assertEqual(len(self.catalog(getId='new1', Title='Title 1')), 1)
+        self.assertEqual(len(self.catalog(getId='doc1')), 0)
+
+    def testRenameObjectsByPathsFailure(self):
+        # renaming to an existing id fails, the other rename goes through
+        paths = [self.base + '/doc1', self.base + '/doc2']
+        success, failure = self.utils.renameObjectsByPaths(
+            paths, ['sub', 'new2'], ['Title 1', 'Title 2'])
+        self.assertEqual(failure.keys(), [self.base + '/doc1'])
+        self.assertEqual(success.keys(), [self.base + '/doc2'])
+        self.assertEqual(self.folder.doc1.Title(), '')
+        self.assertEqual(self.folder.new2.Title(), 'Title 2')
+
+    def testRenameObjectsByPathsRepeated(self):
+        # the new ids are paired with the paths by position
+        path = self.base + '/doc1'
+        success, failure = self.utils.renameObjectsByPaths(
+            [path, path], ['new1', 'new2'], ['', ''])
+        self.assertEqual(success, {path: ('new1', '')})
+        self.assertEqual(failure.keys(), [path])
+        self.assertTrue('new1' in self.folder)
+        self.assertFalse('new2' in self.folder)
+
+    def testRenameObjectsByPathsReservedId(self):
+        paths = [self.base + '/doc1', self.base + '/doc2']
+        success, failure = self.utils.renameObjectsByPaths(
+            paths, ['login', 'new2'], ['', ''])
+        self.assertEqual(failure.keys(), [self.base + '/doc1'])
+        self.assertEqual(success.keys(), [self.base + '/doc2'])
+        self.assertTrue('doc1' in self.folder)
+
+    def testTransitionObjectsByPathsIncludeChildren(self):
+        self.setRoles(['Manager'])
+        failure = self.utils.transitionObjectsByPaths(
+            'publish', [self.base + '/sub'], include_children=True)
+        self.assertEqual(failure, {})
+        wf = self.portal.portal_workflow
+        self.assertEqual(
+            wf.getInfoFor(self.folder.sub.doc3, 'review_state'),
+            'published')
+        self.assertEqual(
+            len(self.catalog(getId='doc3', review_state='published')), 1)
+
+
 class TestBreadCrumbs(PloneTestCase.PloneTestCase):
     '''Tests for the portal tabs query'''
 
@@ -662,6 +771,33 @@ class TestIDGenerationMethods(PloneTestCase.PloneTestCase):
         self.assertEqual(self.utils.pretty_title_or_id(results[0]),
                                                         self.folder.getId())
 
+    def test_pretty_title_metadata_on_catalog_brain(self):
+        cat = self.portal.portal_catalog
+        self.setRoles(['Manager', 'Member'])
+        self.folder.edit(title='', subject='foobar')
+        brain = cat(Subject='foobar')[0]
+        self.assertEqual(brain.pretty_title, self.folder.getId())
+        self.folder.edit(id='folder.2004-11-09.0123456789', title='',
+                         subject='foobar')
+        brain = cat(Subject='foobar')[0]
+        self.assertEqual(brain.pretty_title, '')
+        self.assertEqual(self.utils.pretty_title_or_id(brain, 'Marker'),
+                         'Marker')
+
+    def testAutoGeneratedIdFollowsTypeChanges(self):
+        self.assertFalse(
+            self.utils.isIDAutoGenerated('dummy_type.2004-11-09.0123456789'))
+        types = self.portal.portal_types
+        fti = types.Document._getCopy(types)
+        fti._setId('Dummy Type')
+        types._setObject('Dummy Type', fti)
+        self.assertTrue(
+            self.utils.isIDAutoGenerated('dummy_type.2004-11-09.0123456789'))
+        self.assertFalse(
+            self.utils.isIDAutoGenerated('dummy_type.2004-13-09.0123456789'))
+        self.assertFalse(
+            self.utils.isIDAutoGenerated('dummy_type.2004-11-09.0'))
+
     def testGetMethodAliases(self):
         fti = self.folder.getTypeInfo()
         expectedAliases = fti.getMethodAliases()
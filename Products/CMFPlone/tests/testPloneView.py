@@ -49,6 +49,20 @@ class TestPloneView(PloneTestCase.PloneTestCase):
         view = Plone(self.folder.test, self.app.REQUEST)
         self.assertTrue(view.isDefaultPageInFolder())
 
+    def testShowToolbarMemoizedOnRequest(self):
+        view = Plone(self.folder, self.app.REQUEST)
+        self.assertTrue(view.showToolbar())
+        self.logout()
+        # Another user does not get the memoized result
+        self.assertFalse(Plone(self.folder, self.app.REQUEST).showToolbar())
+
+    def testHasAddableTypes(self):
+        from Products.CMFPlone.browser.ploneview import hasAddableTypes
+        self.assertEqual(hasAddableTypes(self.folder),
+                         bool(self.folder.allowedContentTypes()))
+        self.logout()
+        self.assertFalse(hasAddableTypes(self.folder))
+
     def testNavigationRootPath(self):
         view = Plone(self.folder, self.app.REQUEST)
         self.assertEqual(view.navigationRootPath(),
@@ -1,6 +1,8 @@
 from xml.dom.minidom import parseString
 from Products.CMFPlone.tests import PloneTestCase
 from Products.CMFPlone.resources.browser.cook import cookWhenChangingSettings
+from Products.CMFPlone.resources.browser.resource import get_bundle_manifest
+from Products.CMFPlone.resources.browser.resource import order_bundles
 from zope.component import getUtility
 from plone.registry.interfaces import IRegistry
 from Products.CMFCore.utils import getToolByName
@@ -14,6 +16,8 @@ from Products.CMFPlone.resources.exportimport.resourceregistry import (
     ResourceRegistryNodeAdapter)
 from plone.resource.interfaces import IResourceDirectory
 
+import transaction
+
 
 class TestResourceRegistries(PloneTestCase.PloneTestCase):
 
@@ -96,6 +100,99 @@ class TestResourceRegistries(PloneTestCase.PloneTestCase):
 
         self.assertTrue('error cooking' in resp.getBody())
 
+    def test_compiled_bundle_cached_for_version(self):
+        from Products.CMFPlone.traversal import IMMUTABLE_CACHE_CONTROL
+        import urllib
+        registry = getUtility(IRegistry)
+        bundles = registry.collectionOfInterface(IBundleRegistry,
+                                                 prefix="plone.bundles")
+        bundle = bundles.add('foobar')
+        bundle.jscompilation = '++plone++static/foobar-compiled.js'
+        bundle.resources = []
+        cookWhenChangingSettings(self.portal, bundle)
+
+        url = '%s/++plone++static/foobar-compiled.js' % (
+            self.portal.absolute_url())
+        resp = subrequest('%s?version=%s' % (
+            url, urllib.quote(str(bundle.last_compilation))))
+        self.assertEqual(resp.getHeader('Cache-Control'),
+                         IMMUTABLE_CACHE_CONTROL)
+        self.assertTrue(resp.getHeader('ETag'))
+
+        # Outdated or missing versions are not cached
+        resp = subrequest('%s?version=1' % url)
+        self.assertNotEqual(resp.getHeader('Cache-Control'),
+                            IMMUTABLE_CACHE_CONTROL)
+        resp = subrequest(url)
+        self.assertNotEqual(resp.getHeader('Cache-Control'),
+                            IMMUTABLE_CACHE_CONTROL)
+
+    def test_cooking_single_flight(self):
+        from Products.CMFPlone.resources.browser import cook
+        registry = getUtility(IRegistry)
+        bundles = registry.collectionOfInterface(IBundleRegistry,
+                                                 prefix="plone.bundles")
+        bundle = bundles.add('foobar')
+        bundle.jscompilation = '++plone++static/foobar-compiled.js'
+        bundle.resources = []
+
+        # While another thread cooks the bundle, it is left alone
+        key = ('/'.join(self.portal.getPhysicalPath()), bundle.__prefix__)
+        cook._cooking.add(key)
+        try:
+            cookWhenChangingSettings(self.portal, bundle)
+        finally:
+            cook._cooking.discard(key)
+        self.assertEqual(bundle.last_compilation, None)
+
+        cookWhenChangingSettings(self.portal, bundle)
+        self.assertNotEqual(bundle.last_compilation, None)
+        # The bundle counts as being cooked until the transaction ends
+        self.assertTrue(key in cook._cooking)
+        transaction.abort()
+        self.assertFalse(key in cook._cooking)
+
+    def test_minify_js_cached(self):
+        from Products.CMFPlone.resources.browser.cook import minify_js
+        cooked = minify_js('var  a = 1;')
+        self.assertTrue(minify_js('var  a = 1;') is cooked)
+
+
+class DummyBundle(object):
+
+    def __init__(self, depends=None):
+        self.depends = depends
+
+
+class TestBundleManifest(PloneTestCase.PloneTestCase):
+
+    def test_manifest_follows_registry(self):
+        registry = getUtility(IRegistry)
+        manifest = get_bundle_manifest(registry)
+        self.assertTrue(get_bundle_manifest(registry) is manifest)
+
+        bundles = registry.collectionOfInterface(IBundleRegistry,
+                                                 prefix="plone.bundles")
+        bundle = bundles.add('foobar')
+        bundle.expression = 'python: False'
+        manifest = get_bundle_manifest(registry)
+        snapshot = dict(manifest.bundles)['foobar']
+        self.assertEqual(snapshot.expression, 'python: False')
+        self.assertEqual(snapshot.cooked_expression.text, 'python: False')
+
+        bundle.expression = None
+        manifest = get_bundle_manifest(registry)
+        self.assertEqual(dict(manifest.bundles)['foobar'].cooked_expression,
+                         None)
+
+    def test_order_bundles(self):
+        bundles = [('c', DummyBundle('b')),
+                   ('b', DummyBundle('a')),
+                   ('orphan', DummyBundle('missing')),
+                   ('a', DummyBundle())]
+        self.assertEqual([key for key, bundle in order_bundles(bundles)],
+                         ['a', 'b', 'c', 'orphan'])
+
 
 class TestResourceNodeImporter(PloneTestCase.PloneTestCase):
     """Test features of registry node importer"""
@@ -131,6 +131,38 @@ class TestSection(SearchTestCase):
         title = crumbs(second_level_folder.third_level_document)[0]['Title']
         self.assertEqual(title, 'First Level Folder')
 
+    def test_breadcrumbs_from_catalog(self):
+        portal = self.layer['portal']
+        setRoles(portal, TEST_USER_ID, ['Manager'])
+        login(portal, TEST_USER_NAME)
+
+        portal.invokeFactory('Folder', 'folder', title='Folder')
+        portal.folder.invokeFactory('Folder', 'sub', title='Sub')
+        portal.folder.sub.invokeFactory('Document', 'doc')
+        view = portal.restrictedTraverse('@@search')
+
+        class Item(object):
+            # A search result that can not be woken up
+            def __init__(self, path):
+                self.path = path
+
+            def getPath(self):
+                return self.path
+
+            def getObject(self):
+                raise AssertionError('getObject should not be called')
+
+        path = '/'.join(portal.folder.sub.doc.getPhysicalPath())
+        crumbs = view.breadcrumbs(Item(path))
+        self.assertEqual([c['Title'] for c in crumbs], ['Folder', 'Sub'])
+        self.assertEqual(crumbs[1]['absolute_url'],
+                         portal.folder.sub.absolute_url())
+
+        # Parents that are not cataloged need the objects
+        portal.folder.sub.unindexObject()
+        view = portal.restrictedTraverse('@@search')
+        self.assertRaises(AssertionError, view.breadcrumbs, Item(path))
+
     def test_blacklisted_types_in_results(self):
         """Make sure we don't break types' blacklisting in the new search
         results view.
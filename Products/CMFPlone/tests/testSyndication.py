@@ -149,6 +149,13 @@ class TestSyndicationViews(BaseSyndicationTest):
         self.assertRaises(NotFound,
             self.folder.restrictedTraverse('@@search_rss'))
 
+    def test_feed_not_cached_for_members(self):
+        from plone.memoize.ram import DontCache
+        from Products.CMFPlone.browser.syndication.views import \
+            _renderFeedCacheKey
+        view = self.folder.restrictedTraverse('rss.xml')
+        self.assertRaises(DontCache, _renderFeedCacheKey, None, view)
+
 
 class TestSyndicationFeedAdapter(BaseSyndicationTest):
 
@@ -169,6 +176,14 @@ class TestSyndicationFeedAdapter(BaseSyndicationTest):
         self.assertEqual(len(self.feed._brains()), 3)
         self.assertEqual(len([i for i in self.feed.items]), 3)
 
+    def test_items_loaded_lazily(self):
+        items = self.feed._items()
+        self.assertEqual(len(items), 3)
+        self.assertFalse(items._data)
+        self.assertEqual(len(items[:2]), 2)
+        self.assertEqual(len(items._data), 2)
+        self.assertTrue(items[0] in (self.doc1, self.doc2, self.file))
+
     def test_max_items(self):
         self.feed.settings.max_items = 2
         self.assertEqual(len([i for i in self.feed.items][:self.feed.limit]),
@@ -269,6 +269,31 @@ class TestBigramFunctions(unittest.TestCase):
         for lst, rst in lsts:
             self.assertEqual(rst, list(process_unicode(lst)))
 
+    def test_process_unicode_mixed(self):
+        lsts = [
+            # Different scripts are split apart
+            (u"한국日本", [u"한국", u"국", u"日本", u"本"]),
+            # Halfwidth katakana is normalized first
+            (u"\uff8a\uff9d", [u"\u30cf\u30f3", u"\u30f3"]),
+            # Thai combining marks are no word characters
+            (u"\u0e01\u0e48\u0e2d\u0e19", [u"\u0e01", u"\u0e2d\u0e19",
+                                            u"\u0e19"]),
+            (u"Plone 5 foo_bar", [u"Plone", u"5", u"foo_bar"]),
+            ]
+        for lst, rst in lsts:
+            self.assertEqual(rst, list(process_unicode(lst)))
+
+    def test_process_str_cached(self):
+        first = process_str("日本語 title")
+        first.append("changed")
+        self.assertEqual(process_str("日本語 title"),
+                         ["日本", "本語", "語", "title"])
+
+    def test_process_str_cached_per_encoding(self):
+        self.assertEqual(process_str(u"日本"), ["日本", "本"])
+        self.assertEqual(process_str(u"日本", "euc-jp"),
+                         [u"日本".encode("euc-jp"), u"本".encode("euc-jp")])
+
     def test_process_str_glob(self):
         enc = "utf8"
         lsts = [
@@ -129,6 +129,29 @@ class TestWorkflowTool(PloneTestCase.PloneTestCase):
         self.assertEqual(len(internal_pub_states),
                          all_states.count('internally_published'))
 
+    def testGetWorklistsResults(self):
+        self.workflow.doActionFor(self.doc, 'submit')
+        self.workflow.doActionFor(self.ev, 'submit')
+        self.login('reviewer')
+        results = self.workflow.getWorklistsResults()
+        self.assertEqual(set([o.getId() for o in results]),
+                         set(['doc', 'ev']))
+        self.login('member')
+        self.assertEqual(self.workflow.getWorklistsResults(), ())
+
+    def testWorklistQueriesAreMerged(self):
+        self.workflow.setChainForPortalTypes(['Event'], ['plone_workflow'])
+        self.workflow.doActionFor(self.doc, 'submit')
+        self.workflow.doActionFor(self.ev, 'submit')
+        metadata = self.portal.portal_catalog.schema()
+        queries = self.workflow._getWorklistQueries(metadata)
+        worklists = sum([len(q[1]) for q in queries])
+        self.assertTrue(len(queries) < worklists)
+        self.login('reviewer')
+        results = self.workflow.getWorklistsResults()
+        self.assertEqual(set([o.getId() for o in results]),
+                         set(['doc', 'ev']))
+
     def testAdaptationBasedWorkflowOverride(self):
         # We take a piece of dummy content and register a dummy
         # workflow chain adapter for it.
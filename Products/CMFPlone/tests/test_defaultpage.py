@@ -2,6 +2,7 @@
 from plone.app.testing import setRoles
 from plone.app.testing import TEST_USER_ID
 from Products.CMFPlone.testing import PRODUCTS_CMFPLONE_INTEGRATION_TESTING
+import transaction
 import unittest
 
 
@@ -116,3 +117,24 @@ class DefaultPageTestCase(unittest.TestCase):
 
         from Products.CMFPlone.defaultpage import get_default_page
         self.assertEqual('d1', get_default_page(self.folder))
+
+    def test_get_default_page_follows_folder_changes(self):
+        # The portal keeps its items in _objects, the result of the lookup
+        # is kept on it until its contents or its default_page change
+        from Products.CMFPlone.defaultpage import get_default_page
+        self.portal.invokeFactory('Document', 'd1', title=u"Doc 1")
+        self.portal.default_page = 'd1'
+        self.assertEqual('d1', get_default_page(self.portal))
+        self.assertEqual('d1', get_default_page(self.portal))
+
+        self.portal.invokeFactory('Document', 'd2', title=u"Doc 2")
+        self.portal.default_page = 'd2'
+        self.assertEqual('d2', get_default_page(self.portal))
+
+        self.portal.manage_delObjects(['d2'])
+        self.portal.default_page = ['d2', 'd1']
+        self.assertEqual('d1', get_default_page(self.portal))
+
+        transaction.savepoint(optimistic=True)
+        self.portal.manage_renameObject('d1', 'd3')
+        self.assertIsNone(get_default_page(self.portal))
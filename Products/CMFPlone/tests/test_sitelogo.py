@@ -37,3 +37,19 @@ class SiteLogoFunctionalTest(unittest.TestCase):
             headers['content-disposition'],
             "attachment; filename*=UTF-8''pixel.png"
         )
+
+    def test_sitelogo_not_modified(self):
+        registry = getUtility(IRegistry)
+        settings = registry.forInterface(ISiteSchema, prefix='plone')
+        settings.site_logo = SITE_LOGO_BASE64
+        view = self.portal.restrictedTraverse('@@site-logo')
+        self.assertEqual(view(), SITE_LOGO_HEX)
+        response = view.request.response
+        etag = response.getHeader('ETag')
+        self.assertTrue(etag)
+        self.assertFalse(response.getHeader('Last-Modified'))
+
+        view.request.environ['HTTP_IF_NONE_MATCH'] = etag
+        view = self.portal.restrictedTraverse('@@site-logo')
+        self.assertEqual(view(), '')
+        self.assertEqual(response.getStatus(), 304)
@@ -61,3 +61,32 @@ class ProductsCMFPloneSetupTest(unittest.TestCase):
         self.assertTrue('Document 1' in sitemap)
         self.assertTrue('Folder 2' in sitemap)
         self.assertTrue('Document 12' in sitemap)
+
+    def test_sitemap_escapes_title(self):
+        self.portal.invokeFactory(
+            'Document', 'doc1', title='Fish & <Chips>',
+            description='"quoted"')
+        transaction.commit()
+
+        self.browser.open(self.portal_url + '/sitemap')
+        self.assertTrue('Fish &amp; &lt;Chips&gt;' in self.browser.contents)
+        self.assertTrue('title="&quot;quoted&quot;"' in self.browser.contents)
+        output = lxml.html.fromstring(self.browser.contents)
+        link = output.xpath("//ul[@id='portal-sitemap']//a")[0]
+        self.assertEqual(link.get('href'), self.portal_url + '/doc1')
+
+    def test_sitemap_item_template_customized(self):
+        from Products.CMFPlone.browser.sitemap import SitemapView
+        from Products.Five.browser.pagetemplatefile import \
+            ViewPageTemplateFile
+        self.portal.invokeFactory('Document', 'doc1', title='Document 1')
+
+        class CustomSitemapView(SitemapView):
+            item_template = ViewPageTemplateFile(
+                '../browser/templates/sitemap-item.pt')
+
+        view = SitemapView(self.portal, self.request)
+        self.assertEqual(view._itemRenderer(), view.renderItem)
+        view = CustomSitemapView(self.portal, self.request)
+        self.assertNotEqual(view._itemRenderer(), view.renderItem)
+        self.assertTrue('Document 1' in view.createSiteMap())
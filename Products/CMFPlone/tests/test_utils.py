@@ -64,3 +64,27 @@ class LogoTests(PloneTestCase.PloneTestCase):
         self.assertTrue(
             'http://nohost/plone/logo.png'
             in getSiteLogo())
+
+
+class LazyObjectsTests(PloneTestCase.PloneTestCase):
+
+    def afterSetUp(self):
+        for id in ('doc1', 'doc2', 'doc3'):
+            self.folder.invokeFactory('Document', id)
+
+    def test_lazyObjects(self):
+        from Products.CMFPlone.utils import lazyObjects
+        brains = self.portal.portal_catalog(
+            path={'query': '/'.join(self.folder.getPhysicalPath()),
+                  'depth': 1},
+            sort_on='getObjPositionInParent')
+        objects = lazyObjects(brains)
+        self.assertEqual(len(objects), 3)
+        self.assertEqual(objects.actual_result_count, 3)
+        self.assertEqual(objects[1].getId(), 'doc2')
+
+    def test_getFolderContents_full_objects_batch(self):
+        batch = self.folder.getFolderContents(batch=True, b_size=2,
+                                              full_objects=True)
+        self.assertEqual(batch.sequence_length, 3)
+        self.assertEqual([o.getId() for o in batch], ['doc1', 'doc2'])
@@ -1,10 +1,103 @@
+from AccessControl import ClassSecurityInfo
+from Acquisition import Implicit
+from Acquisition import aq_parent
+from App.class_init import InitializeClass
+from OFS.Image import File
 from plone.resource.traversal import ResourceTraverser
 from zope.component import getUtility
+from plone.registry.interfaces import IRegistry
 from plone.resource.interfaces import IResourceDirectory
 from Products.CMFPlone.interfaces.resources import (
     OVERRIDE_RESOURCE_DIRECTORY_NAME)
+from Products.CMFPlone.resources.browser.resource import get_bundle_manifest
 from zope.globalrequest import getRequest
 
+import gzip
+import hashlib
+import StringIO
+
+# Compiled bundles requested with their current version never change
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Gzipped bundle data by etag
+_gzipped = {}
+GZIP_CACHE_SIZE = 50
+GZIP_MIN_SIZE = 1024
+
+
+def _etag(file):
+    """Content hash of a file, kept on it as long as its size is the
+    same.  plone.resource writes new file objects on every change.
+    """
+    cached = getattr(file, '_v_bundle_etag', None)
+    if cached is None or cached[0] != file.size:
+        cached = (file.size, '"%s"' % hashlib.md5(str(file.data)).hexdigest())
+        file._v_bundle_etag = cached
+    return cached[1]
+
+
+def _gzip(etag, data):
+    compressed = _gzipped.get(etag)
+    if compressed is None:
+        out = StringIO.StringIO()
+        zipped = gzip.GzipFile(fileobj=out, mode='wb')
+        zipped.write(data)
+        zipped.close()
+        compressed = out.getvalue()
+        if len(_gzipped) >= GZIP_CACHE_SIZE:
+            _gzipped.clear()
+        _gzipped[etag] = compressed
+    return compressed
+
+
+def is_current_version(resource_path, version):
+    """Tell if version is the last compilation of the bundle compiled to
+    ++plone++resource_path.
+    """
+    path = '++plone++' + resource_path
+    manifest = get_bundle_manifest(getUtility(IRegistry))
+    for key, bundle in manifest.bundles:
+        if path in (bundle.jscompilation, bundle.csscompilation):
+            return str(bundle.last_compilation) == version
+    return False
+
+
+class CompiledBundleFile(Implicit):
+    """A compiled bundle file published with its current version, so it
+    can be cached forever.
+    """
+
+    security = ClassSecurityInfo()
+    security.declareObjectPublic()
+
+    def __init__(self, file):
+        self.file = file
+
+    security.declarePublic('index_html')
+    def index_html(self, REQUEST, RESPONSE):
+        """Serve the file with an etag and far future caching headers,
+        gzipped when the client accepts it.
+        """
+        file = self.file
+        etag = _etag(file)
+        RESPONSE.setHeader('ETag', etag)
+        RESPONSE.setHeader('Cache-Control', IMMUTABLE_CACHE_CONTROL)
+        RESPONSE.setHeader('Vary', 'Accept-Encoding')
+        if_none_match = REQUEST.get_header('If-None-Match', '') or ''
+        if etag in [tag.strip() for tag in if_none_match.split(',')]:
+            RESPONSE.setStatus(304)
+            return ''
+        accept = REQUEST.get_header('Accept-Encoding', '') or ''
+        if 'gzip' not in accept or file.size < GZIP_MIN_SIZE:
+            return file.index_html(REQUEST, RESPONSE)
+        data = _gzip(etag, str(file.data))
+        RESPONSE.setHeader('Content-Type', file.content_type)
+        RESPONSE.setHeader('Content-Encoding', 'gzip')
+        RESPONSE.setHeader('Content-Length', len(data))
+        return data
+
+InitializeClass(CompiledBundleFile)
+
 
 class PloneBundlesTraverser(ResourceTraverser):
 
@@ -26,7 +119,15 @@ class PloneBundlesTraverser(ResourceTraverser):
             if resource_name in container:
                 directory = container[resource_name]
                 try:
-                    return directory[resource_filepath]
+                    resource = directory[resource_filepath]
                 except:
                     pass
-        return super(PloneBundlesTraverser, self).traverse(name, remaining)
\ No newline at end of file
+                else:
+                    version = req.form.get('version')
+                    parent = aq_parent(resource)
+                    if version and isinstance(resource, File) and \
+                            parent is not None and \
+                            is_current_version(resource_path, version):
+                        return CompiledBundleFile(resource).__of__(parent)
+                    return resource
+        return super(PloneBundlesTraverser, self).traverse(name, remaining)
@@ -17,6 +17,8 @@ from Products.CMFCore.permissions import ManageUsers
 from Products.CMFCore.utils import getToolByName
 from Products.CMFCore.utils import ToolInit as CMFCoreToolInit
 from Products.CMFPlone import PloneMessageFactory as _
+from Products.ZCatalog.interfaces import ICatalogBrain
+from Products.ZCatalog.Lazy import LazyMap
 from types import ClassType
 from webdav.interfaces import IWriteLock
 from zope import schema
@@ -93,30 +95,67 @@ def createSiteMap(context, request, sitemap=False):
     return view.siteMap()
 
 
+_AUTOGENERATED_ID = re.compile(r'^(.+)\.([^.]+)\.([^.]+)$')
+_AUTOGENERATED_DATES = {}
+_AUTOGENERATED_DATES_SIZE = 1000
+
+
+def _autogenerated_type_names(context):
+    """Type names, as is and in lower case, that may start an
+    autogenerated id.
+
+    The set is kept on the types tool until an item is added, removed or
+    renamed (which replaces its ``_objects``) or the tool is changed in
+    the current transaction.
+    """
+    pt = aq_base(getToolByName(context, 'portal_types'))
+    objects = getattr(pt, '_objects', None)
+    changed = getattr(pt, '_p_changed', False)
+    cached = getattr(pt, '_v_autogenerated_type_names', None)
+    if cached is not None and cached[0] is objects and not changed:
+        return cached[1]
+    portaltypes = pt.listContentTypes()
+    names = frozenset(portaltypes + [t.lower() for t in portaltypes])
+    if not changed:
+        pt._v_autogenerated_type_names = (objects, names)
+    return names
+
+
+def _is_autogenerated_date(value):
+    valid = _AUTOGENERATED_DATES.get(value)
+    if valid is None:
+        try:
+            valid = bool(DateTime(value))
+        except (ValueError, AttributeError, IndexError, DateTimeError):
+            valid = False
+        if len(_AUTOGENERATED_DATES) >= _AUTOGENERATED_DATES_SIZE:
+            _AUTOGENERATED_DATES.clear()
+        _AUTOGENERATED_DATES[value] = valid
+    return valid
+
+
 def isIDAutoGenerated(context, id):
     # In 2.1 non-autogenerated is the common case, caught exceptions are
     # expensive, so let's make a cheap check first
     if id.count('.') < 2:
         return False
 
-    pt = getToolByName(context, 'portal_types')
-    portaltypes = pt.listContentTypes()
-    portaltypes.extend([t.lower() for t in portaltypes])
-
+    match = _AUTOGENERATED_ID.match(id)
+    if match is None:
+        return False
+    obj_type, date_created, random_number = match.groups()
     try:
-        parts = id.split('.')
-        random_number = parts.pop()
-        date_created = parts.pop()
-        obj_type = '.'.join(parts)
-        type = ' '.join(obj_type.split('_'))
-        # New autogenerated ids may have a lower case portal type
-        if ((type in portaltypes or obj_type in portaltypes) and
-                DateTime(date_created) and float(random_number)):
-            return True
-    except (ValueError, AttributeError, IndexError, DateTimeError):
-        pass
+        if not float(random_number):
+            return False
+    except ValueError:
+        return False
 
-    return False
+    # New autogenerated ids may have a lower case portal type
+    portaltypes = _autogenerated_type_names(context)
+    type = ' '.join(obj_type.split('_'))
+    if type not in portaltypes and obj_type not in portaltypes:
+        return False
+    return _is_autogenerated_date(date_created)
 
 
 def isExpired(content):
@@ -157,6 +196,15 @@ def pretty_title_or_id(context, obj, empty_value=_marker):
        of whether obj is a catalog brain or an object, but returning an
        empty title marker if the id is not set (i.e. it's auto-generated).
     """
+    if ICatalogBrain.providedBy(obj):
+        # Use the precomputed pretty_title metadata when the catalog has it
+        title = getattr(obj, 'pretty_title', None)
+        if isinstance(title, basestring):
+            if title:
+                return title
+            if empty_value is _marker:
+                empty_value = getEmptyTitle(context)
+            return empty_value
     # if safe_hasattr(obj, 'aq_explicit'):
     #    obj = obj.aq_explicit
     # title = getattr(obj, 'Title', None)
@@ -177,6 +225,21 @@ def pretty_title_or_id(context, obj, empty_value=_marker):
     return empty_value
 
 
+def _getObject(brain):
+    return brain.getObject()
+
+
+def lazyObjects(brains):
+    """Return the objects of catalog results as a lazy sequence.
+
+    An object is only loaded when its item is accessed, so batching the
+    sequence only wakes the objects of the current page.  The length and
+    actual_result_count of the results are kept.
+    """
+    return LazyMap(_getObject, brains, len(brains),
+                   getattr(brains, 'actual_result_count', None))
+
+
 def getSiteEncoding(context):
     return 'utf-8'
 deprecated('getSiteEncoding',
@@ -668,7 +731,7 @@ def getQuality():
 
 def getSiteLogo(site=None):
     from Products.CMFPlone.interfaces import ISiteSchema
-    from plone.formwidget.namedfile.converter import b64decode_file
+    from Products.CMFPlone.browser.sitelogo import getDecodedLogo
     if site is None:
         site = getSite()
     registry = getUtility(IRegistry)
@@ -676,7 +739,7 @@ def getSiteLogo(site=None):
     site_url = site.absolute_url()
 
     if getattr(settings, 'site_logo', False):
-        filename, data = b64decode_file(settings.site_logo)
+        filename = getDecodedLogo(settings.site_logo)[0]
         return '{}/@@site-logo/{}'.format(
             site_url, filename)
     else: